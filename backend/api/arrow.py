@@ -0,0 +1,118 @@
+import io
+from array import array
+from typing import Any, AsyncIterator, Callable
+
+from src.domain.models import CustomerBatch, SalesBatch
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_FLUSH_BYTES = 1 << 20
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def sales_schema() -> "pa.Schema":
+    # Categories and regions repeat on every row, so they travel dictionary encoded
+    return pa.schema([
+        ("date", pa.date32()),
+        ("sales", pa.float64()),
+        ("category", pa.dictionary(pa.int32(), pa.string())),
+        ("region", pa.dictionary(pa.int32(), pa.string())),
+    ])
+
+
+def customer_schema() -> "pa.Schema":
+    return pa.schema([
+        ("customer_id", pa.int64()),
+        ("age", pa.int32()),
+        ("gender", pa.dictionary(pa.int32(), pa.string())),
+        ("purchase_amount", pa.float64()),
+        ("satisfaction", pa.int32()),
+    ])
+
+
+def _from_buffer(values: array, arrow_type: "pa.DataType") -> "pa.Array":
+    # Wraps the array's memory rather than copying it
+    return pa.Array.from_buffers(arrow_type, len(values), [None, pa.py_buffer(values)])
+
+
+def _dictionary(codes: array, labels: tuple[str, ...]) -> "pa.DictionaryArray":
+    return pa.DictionaryArray.from_arrays(_from_buffer(codes, pa.int32()), pa.array(labels, pa.string()))
+
+
+def sales_record_batch(batch: SalesBatch, schema: "pa.Schema") -> "pa.RecordBatch":
+    return pa.RecordBatch.from_arrays(
+        [
+            _from_buffer(batch.days, pa.date32()),
+            _from_buffer(batch.sales, pa.float64()),
+            _dictionary(batch.category_codes, batch.categories),
+            _dictionary(batch.region_codes, batch.regions),
+        ],
+        schema=schema,
+    )
+
+
+def customer_record_batch(batch: CustomerBatch, schema: "pa.Schema") -> "pa.RecordBatch":
+    return pa.RecordBatch.from_arrays(
+        [
+            _from_buffer(batch.customer_ids, pa.int64()),
+            _from_buffer(batch.ages, pa.int32()),
+            _dictionary(batch.gender_codes, batch.genders),
+            _from_buffer(batch.purchase_amounts, pa.float64()),
+            _from_buffer(batch.satisfaction, pa.int32()),
+        ],
+        schema=schema,
+    )
+
+
+class _DrainedSink(io.RawIOBase):
+    """Write target for the IPC writer whose bytes are handed out as they arrive."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self.pending = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.pending = 0
+        return data
+
+
+async def encode_arrow_stream(
+    batches: AsyncIterator[Any],
+    schema: "pa.Schema",
+    to_record_batch: Callable[[Any, "pa.Schema"], "pa.RecordBatch"],
+) -> AsyncIterator[bytes]:
+    """Serialize domain batches as an Arrow IPC stream.
+
+    Output is flushed once ARROW_FLUSH_BYTES have been written, so the response
+    starts before the query finishes and memory stays bounded.
+    """
+    sink = _DrainedSink()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    async for batch in batches:
+        if len(batch):
+            writer.write_batch(to_record_batch(batch, schema))
+        if sink.pending >= ARROW_FLUSH_BYTES:
+            yield sink.drain()
+    writer.close()
+
+    data = sink.drain()
+    if data:
+        yield data
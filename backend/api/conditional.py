@@ -0,0 +1,45 @@
+import os
+from typing import Optional
+
+from fastapi import Request, Response
+
+from src.domain.models import FilterCriteria
+from src.infrastructure.cache import filter_cache_key
+from src.infrastructure.data_version import data_version
+
+# How long a shared cache such as nginx may reuse a response before revalidating it;
+# browsers revalidate every time
+HTTP_CACHE_SHARED_MAX_AGE = int(os.getenv("HTTP_CACHE_SHARED_MAX_AGE", "5"))
+
+
+def response_etag(endpoint: str, filters: Optional[FilterCriteria] = None) -> str:
+    """A weak ETag for the current data version, the endpoint and its canonical filters.
+
+    endpoint must include every parameter besides the filters that changes
+    the response, such as the granularity or the negotiated format.
+    """
+    return f'W/"{data_version.current}-{filter_cache_key(endpoint, filters)[:32]}"'
+
+
+def cache_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age=0, s-maxage={HTTP_CACHE_SHARED_MAX_AGE}, must-revalidate",
+        "Vary": "Accept",
+    }
+
+
+def _opaque_tag(etag: str) -> str:
+    # If-None-Match uses the weak comparison, which ignores the W/ prefix
+    return etag.strip().removeprefix("W/")
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the request's If-None-Match already names etag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {_opaque_tag(tag) for tag in if_none_match.split(",")}
+    if "*" in tags or _opaque_tag(etag) in tags:
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
@@ -0,0 +1,81 @@
+import asyncio
+import re
+import threading
+import time
+
+from src.infrastructure.metrics import request_duration
+from src.infrastructure.profiler import (
+    PROFILE_OUTPUT_DIR,
+    PROFILING_ENABLED,
+    SamplingProfiler,
+)
+from src.infrastructure.tracing import RequestTimings, current_timings
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _route_label(scope) -> str:
+    # The route template rather than the raw path keeps the label set bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _profile_path(scope):
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+    return PROFILE_OUTPUT_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{time.monotonic_ns()}-{scope['method']}-{slug}.collapsed"
+
+
+class InstrumentationMiddleware:
+    """Records request latency and stage timings, and profiles requests on demand.
+
+    Each response carries a Server-Timing header with the stages that ran
+    before it started. With PROFILING_ENABLED, a request sent with an
+    X-Profile header is sampled until its body has been sent; the collapsed
+    stacks are written under PROFILE_OUTPUT_DIR and the file is named in the
+    X-Profile-Output response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status = 500
+
+        profiler = None
+        profile_path = None
+        if PROFILING_ENABLED and any(name == PROFILE_HEADER for name, _ in scope["headers"]):
+            profiler = SamplingProfiler(threading.get_ident())
+            profile_path = _profile_path(scope)
+            profiler.start()
+
+        async def send_with_timings(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                server_timing = timings.server_timing()
+                if server_timing:
+                    headers.append((b"server-timing", server_timing.encode("latin-1")))
+                if profile_path is not None:
+                    headers.append((b"x-profile-output", str(profile_path).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            current_timings.reset(token)
+            request_duration.observe(
+                (scope["method"], _route_label(scope), str(status)),
+                time.perf_counter() - started,
+            )
+            if profiler is not None:
+                profiler.stop()
+                await asyncio.to_thread(profiler.write, profile_path)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SalesDataResponse(BaseModel):
@@ -19,6 +19,18 @@ class CustomerDataResponse(BaseModel):
     satisfaction: int
 
 
+class SalesPageResponse(BaseModel):
+    items: List[SalesDataResponse]
+    next_cursor: Optional[str]
+    total_count: int
+
+
+class CustomerPageResponse(BaseModel):
+    items: List[CustomerDataResponse]
+    next_cursor: Optional[str]
+    total_count: int
+
+
 class FilterRequest(BaseModel):
     date_range: Optional[Tuple[datetime, datetime]] = None
     categories: Optional[List[str]] = None
@@ -27,6 +39,15 @@ class FilterRequest(BaseModel):
     age_range: Optional[Tuple[int, int]] = None
     genders: Optional[List[str]] = None
     satisfaction_filter: Optional[str] = None
+    approximate: bool = Field(
+        False,
+        description=(
+            "Allow sales figures to be estimated. Only requests with a sales_range are sampled, since the "
+            "daily rollup and the in-memory snapshot answer the others exactly and faster. Approximate "
+            "responses always carry sample_fraction and error bounds: 1.0 and zero errors when the answer "
+            "is exact. Customer figures are always exact."
+        ),
+    )
 
 
 class MetricsResponse(BaseModel):
@@ -34,18 +55,33 @@ class MetricsResponse(BaseModel):
     avg_daily_sales: float
     total_customers: int
     avg_satisfaction: float
+    sample_fraction: Optional[float] = None
+    total_sales_error: Optional[float] = None
+    avg_daily_sales_error: Optional[float] = None
 
 
 class ChartDataPoint(BaseModel):
     x: str
     y: float
+    error: Optional[float] = None
+
+
+class HistogramBin(BaseModel):
+    age: int
+    count: int
 
 
 class ChartDataResponse(BaseModel):
     line_chart: List[ChartDataPoint]
     pie_chart: List[ChartDataPoint]
     bar_chart: List[ChartDataPoint]
-    histogram: List[int]
+    histogram: List[HistogramBin]
+    sample_fraction: Optional[float] = None
+
+
+class DashboardResponse(BaseModel):
+    metrics: MetricsResponse
+    chart_data: ChartDataResponse
 
 
 class FilterOptionsResponse(BaseModel):
@@ -53,4 +89,29 @@ class FilterOptionsResponse(BaseModel):
     regions: List[str]
     sales_range: Tuple[float, float]
     age_range: Tuple[int, int]
-    genders: List[str]
\ No newline at end of file
+    genders: List[str]
+
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    size: int
+    max_entries: int
+    ttl_seconds: float
+
+
+class PoolStatsResponse(BaseModel):
+    engine: str
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    saturation: float
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
@@ -1,62 +1,336 @@
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.api.arrow import (
+    arrow_available,
+    customer_record_batch,
+    customer_schema,
+    encode_arrow_stream,
+    sales_record_batch,
+    sales_schema,
+)
+from backend.api.conditional import cache_headers, not_modified, response_etag
 from backend.api.models import (
-    ChartDataPoint,
+    CacheStatsResponse,
     ChartDataResponse,
     CustomerDataResponse,
+    CustomerPageResponse,
+    DashboardResponse,
     FilterOptionsResponse,
     FilterRequest,
     MetricsResponse,
+    PoolStatsResponse,
     SalesDataResponse,
+    SalesPageResponse,
+)
+from backend.api.serialization import (
+    DatetimeStrings,
+    FastJSONResponse,
+    customer_row,
+    customer_rows,
+    sales_row,
+    sales_rows,
+)
+from backend.api.streaming import (
+    STREAM_MEDIA_TYPES,
+    encode_stream,
+    negotiate_stream_format,
 )
 from src.application.use_cases import DataAnalysisUseCase
 from src.config import DIContainer
-from src.domain.models import FilterCriteria
-from src.infrastructure.database import get_database
+from src.domain.models import (
+    ChartData,
+    CustomerBatch,
+    FilterCriteria,
+    SalesBatch,
+    SalesMetrics,
+)
+from src.infrastructure.cache import result_cache
+from src.infrastructure.database import (
+    AsyncReadSessionLocal,
+    get_read_database,
+    pool_stats,
+)
+from src.infrastructure.executor import analytics_executor
+from src.infrastructure.metrics import metrics_registry, render_samples
+from src.infrastructure.shared_cache import shared_result_cache
+from src.infrastructure.singleflight import single_flight
+from src.infrastructure.tracing import span
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_CHART_POINTS = 5000
 
-async def get_use_case(db: AsyncSession = Depends(get_database)) -> DataAnalysisUseCase:
-    container = DIContainer(db_session=db)
+
+def _use_case(db: AsyncSession) -> DataAnalysisUseCase:
+    container = DIContainer(db_session=db, session_factory=AsyncReadSessionLocal)
     return container.data_analysis_use_case
 
 
+async def get_use_case(db: AsyncSession = Depends(get_read_database)) -> DataAnalysisUseCase:
+    return _use_case(db)
+
+
+async def _stream_sales_batches(filters: FilterCriteria) -> AsyncIterator[SalesBatch]:
+    # Streaming outlives the request-scoped session, so it owns its session
+    async with AsyncReadSessionLocal() as session:
+        use_case = DIContainer(db_session=session).data_analysis_use_case
+        async for batch in use_case.stream_filtered_sales_batches(filters):
+            yield batch
+
+
+async def _stream_customer_batches(filters: FilterCriteria) -> AsyncIterator[CustomerBatch]:
+    async with AsyncReadSessionLocal() as session:
+        use_case = DIContainer(db_session=session).data_analysis_use_case
+        async for batch in use_case.stream_filtered_customer_batches(filters):
+            yield batch
+
+
+async def _stream_sales_rows(filters: FilterCriteria) -> AsyncIterator[dict]:
+    datetime_strings = DatetimeStrings()
+    async for batch in _stream_sales_batches(filters):
+        for sale in batch:
+            yield sales_row(sale, datetime_strings)
+
+
+async def _stream_customer_rows(filters: FilterCriteria) -> AsyncIterator[dict]:
+    async for batch in _stream_customer_batches(filters):
+        for customer in batch:
+            yield customer_row(customer)
+
+
+def _require_arrow() -> None:
+    if not arrow_available():
+        raise HTTPException(status_code=406, detail="Arrow responses require pyarrow on the server")
+
+
+def _without_none(content: dict) -> dict:
+    return {key: value for key, value in content.items() if value is not None}
+
+
+def _metrics_content(metrics: SalesMetrics) -> dict:
+    """MetricsResponse-shaped dict; the estimate fields are only present for approximate requests."""
+    return _without_none({
+        "total_sales": metrics.total_sales,
+        "avg_daily_sales": metrics.avg_daily_sales,
+        "total_customers": metrics.total_customers,
+        "avg_satisfaction": metrics.avg_satisfaction,
+        "sample_fraction": metrics.sample_fraction,
+        "total_sales_error": metrics.total_sales_error,
+        "avg_daily_sales_error": metrics.avg_daily_sales_error,
+    })
+
+
+def _chart_points(data: list[tuple], errors: Optional[List[float]]) -> list[dict]:
+    if errors is None:
+        return [{"x": x, "y": y} for x, y in data]
+    return [{"x": x, "y": y, "error": error} for (x, y), error in zip(data, errors)]
+
+
+def _chart_data_content(chart_data: ChartData) -> dict:
+    """ChartDataResponse-shaped dict; errors are only present for approximate requests."""
+    line_chart_data = [(date.strftime("%Y-%m-%d"), sales) for date, sales in chart_data.line_chart_data]
+    
+    return _without_none({
+        "line_chart": _chart_points(line_chart_data, chart_data.line_chart_errors),
+        "pie_chart": _chart_points(chart_data.pie_chart_data, chart_data.pie_chart_errors),
+        "bar_chart": _chart_points(chart_data.bar_chart_data, chart_data.bar_chart_errors),
+        "histogram": [{"age": age, "count": count} for age, count in chart_data.histogram_data],
+        "sample_fraction": chart_data.sample_fraction,
+    })
+
+
 @router.get("/api/filter-options", response_model=FilterOptionsResponse)
-async def get_filter_options(use_case: DataAnalysisUseCase = Depends(get_use_case)):
-    sales_data = await use_case.sales_repository.get_sales_data()
-    customer_data = await use_case.customer_repository.get_customer_data()
-    
-    categories = list(set(sale.category for sale in sales_data))
-    regions = list(set(sale.region for sale in sales_data))
-    sales_range = (
-        min(sale.sales for sale in sales_data),
-        max(sale.sales for sale in sales_data)
-    )
-    age_range = (
-        min(customer.age for customer in customer_data),
-        max(customer.age for customer in customer_data)
-    )
-    genders = list(set(customer.gender for customer in customer_data))
+async def get_filter_options(
+    request: Request,
+    response: Response,
+    use_case: DataAnalysisUseCase = Depends(get_use_case)
+):
+    etag = response_etag("filter-options")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
+    filter_options = await use_case.get_filter_options()
+    
+    response.headers.update(cache_headers(etag))
     return FilterOptionsResponse(
-        categories=categories,
-        regions=regions,
-        sales_range=sales_range,
-        age_range=age_range,
-        genders=genders
+        categories=filter_options.categories,
+        regions=filter_options.regions,
+        sales_range=filter_options.sales_range,
+        age_range=filter_options.age_range,
+        genders=filter_options.genders
     )
 
 
+@router.get("/api/stats/cache", response_model=CacheStatsResponse)
+async def get_cache_stats():
+    stats = result_cache.stats()
+    
+    return CacheStatsResponse(
+        hits=stats.hits,
+        misses=stats.misses,
+        evictions=stats.evictions,
+        expirations=stats.expirations,
+        invalidations=stats.invalidations,
+        size=stats.size,
+        max_entries=stats.max_entries,
+        ttl_seconds=stats.ttl_seconds
+    )
+
+
+@router.get("/api/stats/pool", response_model=List[PoolStatsResponse])
+async def get_pool_stats():
+    return [
+        PoolStatsResponse(
+            engine=name,
+            pool_size=stats.pool_size,
+            max_overflow=stats.max_overflow,
+            checked_out=stats.checked_out,
+            checked_in=stats.checked_in,
+            overflow=stats.overflow,
+            saturation=stats.saturation,
+            checkouts=stats.checkouts,
+            timeouts=stats.timeouts,
+            wait_seconds_total=stats.wait_seconds_total,
+            wait_seconds_max=stats.wait_seconds_max
+        )
+        for name, stats in pool_stats().items()
+    ]
+
+
+def _collect_pool_and_cache_metrics() -> List[str]:
+    pools = pool_stats().items()
+    cache = result_cache.stats()
+    return [
+        *render_samples(
+            "db_pool_checked_out", "Connections currently checked out of the pool.", "gauge",
+            [({"engine": name}, stats.checked_out) for name, stats in pools]
+        ),
+        *render_samples(
+            "db_pool_saturation", "Checked-out connections as a fraction of pool_size + max_overflow.", "gauge",
+            [({"engine": name}, stats.saturation) for name, stats in pools]
+        ),
+        *render_samples(
+            "db_pool_checkouts_total", "Connections handed out by the pool.", "counter",
+            [({"engine": name}, stats.checkouts) for name, stats in pools]
+        ),
+        *render_samples(
+            "db_pool_timeouts_total", "Checkouts that timed out waiting for a connection.", "counter",
+            [({"engine": name}, stats.timeouts) for name, stats in pools]
+        ),
+        *render_samples(
+            "db_pool_wait_seconds_total", "Time spent waiting for pool checkouts.", "counter",
+            [({"engine": name}, stats.wait_seconds_total) for name, stats in pools]
+        ),
+        *render_samples(
+            "result_cache_hits_total", "Result cache lookups that were served from the cache.", "counter",
+            [({}, cache.hits)]
+        ),
+        *render_samples(
+            "result_cache_misses_total", "Result cache lookups that had to be computed.", "counter",
+            [({}, cache.misses)]
+        ),
+        *render_samples(
+            "result_cache_entries", "Entries currently held by the result cache.", "gauge",
+            [({}, cache.size)]
+        ),
+    ]
+
+
+metrics_registry.add_collector(_collect_pool_and_cache_metrics)
+
+
+def _collect_single_flight_metrics() -> List[str]:
+    stats = single_flight.stats()
+    return [
+        *render_samples(
+            "single_flight_in_flight", "Distinct computations currently shared by concurrent requests.", "gauge",
+            [({}, stats.in_flight)]
+        ),
+        *render_samples(
+            "single_flight_started_total", "Computations started because no identical one was in flight.", "counter",
+            [({}, stats.started)]
+        ),
+        *render_samples(
+            "single_flight_coalesced_total", "Requests that joined an identical computation already in flight.", "counter",
+            [({}, stats.coalesced)]
+        ),
+    ]
+
+
+metrics_registry.add_collector(_collect_single_flight_metrics)
+
+
+def _collect_shared_cache_metrics() -> List[str]:
+    if shared_result_cache is None:
+        return []
+    stats = shared_result_cache.stats()
+    return [
+        *render_samples(
+            "shared_cache_hits_total", "Shared cache lookups served without computing the result.", "counter",
+            [({"backend": stats.backend}, stats.hits)]
+        ),
+        *render_samples(
+            "shared_cache_misses_total", "Shared cache lookups that had to be computed.", "counter",
+            [({"backend": stats.backend}, stats.misses)]
+        ),
+        *render_samples(
+            "shared_cache_errors_total", "Shared cache operations that failed and were treated as misses.", "counter",
+            [({"backend": stats.backend}, stats.errors)]
+        ),
+    ]
+
+
+metrics_registry.add_collector(_collect_shared_cache_metrics)
+
+
+def _collect_executor_metrics() -> List[str]:
+    pools = analytics_executor.stats()
+    return [
+        *render_samples(
+            "executor_queue_depth", "Tasks waiting for a busy executor worker.", "gauge",
+            [({"pool": stats.pool}, stats.queue_depth) for stats in pools]
+        ),
+        *render_samples(
+            "executor_in_flight", "Tasks submitted to the executor pool that have not finished.", "gauge",
+            [({"pool": stats.pool}, stats.in_flight) for stats in pools]
+        ),
+        *render_samples(
+            "executor_capacity", "Workers plus the waiting tasks allowed before submissions are rejected.", "gauge",
+            [({"pool": stats.pool}, stats.workers + stats.max_queue) for stats in pools]
+        ),
+        *render_samples(
+            "executor_submitted_total", "Tasks accepted by the executor pool.", "counter",
+            [({"pool": stats.pool}, stats.submitted) for stats in pools]
+        ),
+        *render_samples(
+            "executor_rejected_total", "Tasks rejected with 503 because the executor pool was saturated.", "counter",
+            [({"pool": stats.pool}, stats.rejected) for stats in pools]
+        ),
+    ]
+
+
+metrics_registry.add_collector(_collect_executor_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics_exposition():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @router.post("/api/sales", response_model=List[SalesDataResponse])
 async def get_sales_data(
     filter_request: FilterRequest,
-    use_case: DataAnalysisUseCase = Depends(get_use_case)
+    request: Request,
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json|arrow)$")
 ):
     filters = FilterCriteria(
         date_range=filter_request.date_range,
@@ -65,25 +339,94 @@ async def get_sales_data(
         sales_range=filter_request.sales_range,
         age_range=filter_request.age_range,
         genders=filter_request.genders,
-        satisfaction_filter=filter_request.satisfaction_filter
+        satisfaction_filter=filter_request.satisfaction_filter,
+        approximate=filter_request.approximate
     )
     
-    sales_data = await use_case.get_filtered_sales_data(filters)
+    stream_format = negotiate_stream_format(stream, request)
+    if stream_format == "arrow":
+        _require_arrow()
     
-    return [
-        SalesDataResponse(
-            date=sale.date,
-            sales=sale.sales,
-            category=sale.category,
-            region=sale.region
+    etag = response_etag(f"sales:{stream_format}", filters)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    if stream_format == "arrow":
+        return StreamingResponse(
+            encode_arrow_stream(_stream_sales_batches(filters), sales_schema(), sales_record_batch),
+            media_type=STREAM_MEDIA_TYPES[stream_format],
+            headers=cache_headers(etag)
         )
-        for sale in sales_data
-    ]
+    if stream_format:
+        return StreamingResponse(
+            encode_stream(_stream_sales_rows(filters), stream_format),
+            media_type=STREAM_MEDIA_TYPES[stream_format],
+            headers=cache_headers(etag)
+        )
+    
+    # Opened here rather than as a dependency, since streamed responses open their own
+    async with AsyncReadSessionLocal() as session:
+        sales_data = await _use_case(session).get_filtered_sales_data(filters)
+    
+    with span("serialize"):
+        return FastJSONResponse(sales_rows(sales_data), headers=cache_headers(etag))
 
 
 @router.post("/api/customers", response_model=List[CustomerDataResponse])
 async def get_customer_data(
     filter_request: FilterRequest,
+    request: Request,
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json|arrow)$")
+):
+    filters = FilterCriteria(
+        date_range=filter_request.date_range,
+        categories=filter_request.categories,
+        regions=filter_request.regions,
+        sales_range=filter_request.sales_range,
+        age_range=filter_request.age_range,
+        genders=filter_request.genders,
+        satisfaction_filter=filter_request.satisfaction_filter,
+        approximate=filter_request.approximate
+    )
+    
+    stream_format = negotiate_stream_format(stream, request)
+    if stream_format == "arrow":
+        _require_arrow()
+    
+    etag = response_etag(f"customers:{stream_format}", filters)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    if stream_format == "arrow":
+        return StreamingResponse(
+            encode_arrow_stream(_stream_customer_batches(filters), customer_schema(), customer_record_batch),
+            media_type=STREAM_MEDIA_TYPES[stream_format],
+            headers=cache_headers(etag)
+        )
+    if stream_format:
+        return StreamingResponse(
+            encode_stream(_stream_customer_rows(filters), stream_format),
+            media_type=STREAM_MEDIA_TYPES[stream_format],
+            headers=cache_headers(etag)
+        )
+    
+    async with AsyncReadSessionLocal() as session:
+        customer_data = await _use_case(session).get_filtered_customer_data(filters)
+    
+    with span("serialize"):
+        return FastJSONResponse(customer_rows(customer_data), headers=cache_headers(etag))
+
+
+@router.post("/api/sales/page", response_model=SalesPageResponse)
+async def get_sales_page(
+    filter_request: FilterRequest,
+    request: Request,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort_by: str = Query("date", pattern="^(date|sales)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
     use_case: DataAnalysisUseCase = Depends(get_use_case)
 ):
     filters = FilterCriteria(
@@ -93,26 +436,75 @@ async def get_customer_data(
         sales_range=filter_request.sales_range,
         age_range=filter_request.age_range,
         genders=filter_request.genders,
-        satisfaction_filter=filter_request.satisfaction_filter
+        satisfaction_filter=filter_request.satisfaction_filter,
+        approximate=filter_request.approximate
     )
     
-    customer_data = await use_case.get_filtered_customer_data(filters)
+    etag = response_etag(f"sales-page:{page_size}:{cursor}:{sort_by}:{order}", filters)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    return [
-        CustomerDataResponse(
-            customer_id=customer.customer_id,
-            age=customer.age,
-            gender=customer.gender,
-            purchase_amount=customer.purchase_amount,
-            satisfaction=customer.satisfaction
+    try:
+        page = await use_case.get_sales_page(
+            filters, page_size, cursor, sort_by, descending=order == "desc"
         )
-        for customer in customer_data
-    ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    with span("serialize"):
+        return FastJSONResponse({
+            "items": sales_rows(page.items),
+            "next_cursor": page.next_cursor,
+            "total_count": page.total_count,
+        }, headers=cache_headers(etag))
+
+
+@router.post("/api/customers/page", response_model=CustomerPageResponse)
+async def get_customer_page(
+    filter_request: FilterRequest,
+    request: Request,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort_by: str = Query("customer_id", pattern="^(customer_id|age|purchase_amount|satisfaction)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    use_case: DataAnalysisUseCase = Depends(get_use_case)
+):
+    filters = FilterCriteria(
+        date_range=filter_request.date_range,
+        categories=filter_request.categories,
+        regions=filter_request.regions,
+        sales_range=filter_request.sales_range,
+        age_range=filter_request.age_range,
+        genders=filter_request.genders,
+        satisfaction_filter=filter_request.satisfaction_filter,
+        approximate=filter_request.approximate
+    )
+    
+    etag = response_etag(f"customers-page:{page_size}:{cursor}:{sort_by}:{order}", filters)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    try:
+        page = await use_case.get_customer_page(
+            filters, page_size, cursor, sort_by, descending=order == "desc"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    with span("serialize"):
+        return FastJSONResponse({
+            "items": customer_rows(page.items),
+            "next_cursor": page.next_cursor,
+            "total_count": page.total_count,
+        }, headers=cache_headers(etag))
 
 
 @router.post("/api/metrics", response_model=MetricsResponse)
 async def get_metrics(
     filter_request: FilterRequest,
+    request: Request,
     use_case: DataAnalysisUseCase = Depends(get_use_case)
 ):
     filters = FilterCriteria(
@@ -122,25 +514,27 @@ async def get_metrics(
         sales_range=filter_request.sales_range,
         age_range=filter_request.age_range,
         genders=filter_request.genders,
-        satisfaction_filter=filter_request.satisfaction_filter
+        satisfaction_filter=filter_request.satisfaction_filter,
+        approximate=filter_request.approximate
     )
     
-    sales_data = await use_case.get_filtered_sales_data(filters)
-    customer_data = await use_case.get_filtered_customer_data(filters)
+    etag = response_etag("metrics", filters)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    metrics = use_case.calculate_metrics(sales_data, customer_data)
+    metrics = await use_case.get_metrics(filters)
     
-    return MetricsResponse(
-        total_sales=metrics.total_sales,
-        avg_daily_sales=metrics.avg_daily_sales,
-        total_customers=metrics.total_customers,
-        avg_satisfaction=metrics.avg_satisfaction
-    )
+    with span("serialize"):
+        return FastJSONResponse(_metrics_content(metrics), headers=cache_headers(etag))
 
 
 @router.post("/api/chart-data", response_model=ChartDataResponse)
 async def get_chart_data(
     filter_request: FilterRequest,
+    request: Request,
+    granularity: str = Query("day", pattern="^(day|week|month|quarter)$"),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_CHART_POINTS),
     use_case: DataAnalysisUseCase = Depends(get_use_case)
 ):
     filters = FilterCriteria(
@@ -150,32 +544,49 @@ async def get_chart_data(
         sales_range=filter_request.sales_range,
         age_range=filter_request.age_range,
         genders=filter_request.genders,
-        satisfaction_filter=filter_request.satisfaction_filter
+        satisfaction_filter=filter_request.satisfaction_filter,
+        approximate=filter_request.approximate
     )
     
-    sales_data = await use_case.get_filtered_sales_data(filters)
-    customer_data = await use_case.get_filtered_customer_data(filters)
+    etag = response_etag(f"chart-data:{granularity}:{max_points}", filters)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    chart_data = use_case.generate_chart_data(sales_data, customer_data)
+    chart_data = await use_case.get_chart_data(filters, granularity, max_points)
     
-    line_chart = [
-        ChartDataPoint(x=date.strftime("%Y-%m-%d"), y=sales)
-        for date, sales in chart_data.line_chart_data
-    ]
+    with span("serialize"):
+        return FastJSONResponse(_chart_data_content(chart_data), headers=cache_headers(etag))
+
+
+@router.post("/api/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    filter_request: FilterRequest,
+    request: Request,
+    granularity: str = Query("day", pattern="^(day|week|month|quarter)$"),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_CHART_POINTS),
+    use_case: DataAnalysisUseCase = Depends(get_use_case)
+):
+    filters = FilterCriteria(
+        date_range=filter_request.date_range,
+        categories=filter_request.categories,
+        regions=filter_request.regions,
+        sales_range=filter_request.sales_range,
+        age_range=filter_request.age_range,
+        genders=filter_request.genders,
+        satisfaction_filter=filter_request.satisfaction_filter,
+        approximate=filter_request.approximate
+    )
     
-    pie_chart = [
-        ChartDataPoint(x=category, y=sales)
-        for category, sales in chart_data.pie_chart_data
-    ]
+    etag = response_etag(f"dashboard:{granularity}:{max_points}", filters)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    bar_chart = [
-        ChartDataPoint(x=region, y=sales)
-        for region, sales in chart_data.bar_chart_data
-    ]
+    dashboard = await use_case.get_dashboard(filters, granularity, max_points)
     
-    return ChartDataResponse(
-        line_chart=line_chart,
-        pie_chart=pie_chart,
-        bar_chart=bar_chart,
-        histogram=chart_data.histogram_data
-    )
\ No newline at end of file
+    with span("serialize"):
+        return FastJSONResponse({
+            "metrics": _metrics_content(dashboard.metrics),
+            "chart_data": _chart_data_content(dashboard.chart_data),
+        }, headers=cache_headers(etag))
\ No newline at end of file
@@ -0,0 +1,75 @@
+import json
+from datetime import datetime
+from typing import Any, Iterable
+
+from fastapi.responses import Response
+
+from src.domain.models import CustomerData, SalesData
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain dicts, lists and scalars as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with dumps, skipping response_model validation.
+
+    Routes return it directly, so their declared response_model only documents
+    the payload in the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class DatetimeStrings(dict):
+    """Memo of formatted sale dates; they repeat heavily, so each is formatted once."""
+
+    def __missing__(self, value) -> str:
+        if isinstance(value, datetime):
+            text = value.isoformat()
+        else:
+            # Matches how the datetime field of SalesDataResponse renders a date
+            text = f"{value.isoformat()}T00:00:00"
+        self[value] = text
+        return text
+
+
+def sales_row(sale: SalesData, datetime_strings: DatetimeStrings) -> dict:
+    """A SalesDataResponse-shaped dict."""
+    return {
+        "date": datetime_strings[sale.date],
+        "sales": sale.sales,
+        "category": sale.category,
+        "region": sale.region,
+    }
+
+
+def customer_row(customer: CustomerData) -> dict:
+    """A CustomerDataResponse-shaped dict."""
+    return {
+        "customer_id": customer.customer_id,
+        "age": customer.age,
+        "gender": customer.gender,
+        "purchase_amount": customer.purchase_amount,
+        "satisfaction": customer.satisfaction,
+    }
+
+
+def sales_rows(sales: Iterable[SalesData]) -> list[dict]:
+    datetime_strings = DatetimeStrings()
+    return [sales_row(sale, datetime_strings) for sale in sales]
+
+
+def customer_rows(customers: Iterable[CustomerData]) -> list[dict]:
+    return [customer_row(customer) for customer in customers]
@@ -0,0 +1,53 @@
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import Request
+
+from backend.api.arrow import ARROW_STREAM_MEDIA_TYPE
+from backend.api.serialization import dumps
+
+STREAM_CHUNK_ROWS = 500
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+}
+
+
+def negotiate_stream_format(stream: Optional[str], request: Request) -> Optional[str]:
+    """Pick the streaming format from the query parameter or the Accept header."""
+    if stream:
+        return stream
+    accept = request.headers.get("accept", "")
+    if STREAM_MEDIA_TYPES["arrow"] in accept:
+        return "arrow"
+    if STREAM_MEDIA_TYPES["ndjson"] in accept:
+        return "ndjson"
+    return None
+
+
+def _encode_chunk(rows: list[bytes], stream_format: str, first_chunk: bool) -> bytes:
+    if stream_format == "ndjson":
+        return b"\n".join(rows) + b"\n"
+    return (b"" if first_chunk else b",") + b",".join(rows)
+
+
+async def encode_stream(rows: AsyncIterator[Any], stream_format: str) -> AsyncIterator[bytes]:
+    """Serialize rows as NDJSON lines or as one chunked JSON array."""
+    if stream_format == "json":
+        yield b"["
+
+    buffer = []
+    first_chunk = True
+    async for row in rows:
+        buffer.append(dumps(row))
+        if len(buffer) >= STREAM_CHUNK_ROWS:
+            yield _encode_chunk(buffer, stream_format, first_chunk)
+            buffer = []
+            first_chunk = False
+
+    if buffer:
+        yield _encode_chunk(buffer, stream_format, first_chunk)
+
+    if stream_format == "json":
+        yield b"]"
@@ -1,9 +1,124 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 
+from backend.api.instrumentation import InstrumentationMiddleware
 from backend.api.routes import router
+from src.domain.models import DataChange
+from src.infrastructure.cache import result_cache
+from src.infrastructure.data_version import (
+    DATA_VERSION_POLL_SECONDS,
+    data_version,
+    read_data_version,
+)
+from src.infrastructure.database import (
+    AsyncSessionLocal,
+    close_database,
+    listen_for_data_changes,
+)
+from src.infrastructure.dimensions import dimension_cache
+from src.infrastructure.executor import ExecutorSaturatedError, analytics_executor
+from src.infrastructure.shared_cache import shared_result_cache
+from src.infrastructure.snapshot import SNAPSHOT_ENABLED, snapshot_store
+
+
+async def refresh_after_data_change(change: Optional[DataChange]):
+    if change is not None and not change.tables:
+        return
+    
+    # Ingested sales may have added categories or regions
+    if change is None or "sales" in change.tables:
+        dimension_cache.invalidate()
+    
+    # Publish the new snapshot before dropping cached results computed from the old one.
+    # It is read from the primary, which a replica may not have caught up with yet.
+    if SNAPSHOT_ENABLED:
+        await snapshot_store.reload(AsyncSessionLocal)
+    
+    # New sales only affect results for the dates they fall on
+    if change is not None and change.tables == ["sales"] and change.date_range:
+        result_cache.invalidate(change.date_range)
+    else:
+        result_cache.invalidate()
+    
+    # Only move to the new version once the caches no longer serve the old data
+    if change is not None and change.version is not None:
+        data_version.advance(change.version)
+    else:
+        await data_version.reload(AsyncSessionLocal)
+    
+    # Every worker receives the notification; pruning twice is harmless
+    if shared_result_cache is not None:
+        await shared_result_cache.prune()
+
+
+async def follow_data_changes(listener, on_data_changed, listener_lost: asyncio.Event):
+    """Listen again whenever the LISTEN connection is lost and poll the stored version.
 
-app = FastAPI(title="Data Analysis API", version="1.0.0")
+    Notifications sent while the connection was down are lost, so every
+    reconnect refreshes everything. The poll catches changes whose
+    notification was missed without the connection visibly dropping.
+    """
+    listening = listener is not None
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(listener_lost.wait(), DATA_VERSION_POLL_SECONDS)
+            except TimeoutError:
+                pass
+            
+            try:
+                if listener_lost.is_set():
+                    listener_lost.clear()
+                    lost, listener = listener, None
+                    await lost.close()
+                if listening and listener is None:
+                    listener = await listen_for_data_changes(on_data_changed, listener_lost.set)
+                    on_data_changed(None)
+                elif await read_data_version(AsyncSessionLocal) > data_version.current:
+                    on_data_changed(None)
+            except (OSError, SQLAlchemyError):
+                # The database is unreachable; try again at the next poll
+                continue
+    finally:
+        if listener is not None:
+            await listener.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    analytics_executor.start()
+    await data_version.reload(AsyncSessionLocal)
+    if SNAPSHOT_ENABLED:
+        await snapshot_store.reload(AsyncSessionLocal)
+    
+    pending_refreshes = set()
+    
+    def on_data_changed(change: Optional[DataChange]):
+        task = asyncio.create_task(refresh_after_data_change(change))
+        pending_refreshes.add(task)
+        task.add_done_callback(pending_refreshes.discard)
+    
+    listener_lost = asyncio.Event()
+    listener = await listen_for_data_changes(on_data_changed, listener_lost.set)
+    follower = asyncio.create_task(follow_data_changes(listener, on_data_changed, listener_lost))
+    try:
+        yield
+    finally:
+        follower.cancel()
+        await asyncio.gather(follower, return_exceptions=True)
+        if shared_result_cache is not None:
+            await shared_result_cache.close()
+        analytics_executor.shutdown()
+        await close_database()
+
+
+app = FastAPI(title="Data Analysis API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,11 +126,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-Profile-Output"],
 )
 
+app.add_middleware(InstrumentationMiddleware)
+
 app.include_router(router)
 
 
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated(request: Request, exc: ExecutorSaturatedError):
+    # Shed load instead of letting queued analytics pile up behind a busy pool
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 @app.get("/")
 async def root():
     return {"message": "Data Analysis API is running"}
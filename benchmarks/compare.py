@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files and flag regressions.
+Usage: python benchmarks/compare.py BASELINE.json CURRENT.json [--threshold 0.1]
+
+Exits with status 1 if any benchmark's median got slower by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load_medians(path: Path) -> dict[tuple[str, str], float]:
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return {
+        (result["group"], result["name"]): result["median"]
+        for result in report["results"]
+        if result["status"] == "ok"
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown of the median reported as a regression")
+    return parser.parse_args()
+
+
+def main(args: argparse.Namespace) -> int:
+    baseline = load_medians(args.baseline)
+    current = load_medians(args.current)
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        change = (after - before) / before if before > 0 else 0.0
+        marker = ""
+        if change > args.threshold:
+            marker = "  REGRESSION"
+            regressions += 1
+        group, name = key
+        print(f"{group:<13} {name:<60} {before * 1000:>10.2f} ms {after * 1000:>10.2f} ms {change:>+8.1%}{marker}")
+
+    for key in sorted(baseline.keys() - current.keys()):
+        print(f"{key[0]:<13} {key[1]:<60} missing from {args.current}")
+
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Synthetic sales and customer data for benchmarks.
+Usage: python benchmarks/generate.py [--scale 10k|1m|10m] [--customers N] [--seed N] [--output DIR]
+
+The files it writes can be loaded into PostgreSQL with database/migrations/migrate_data.py.
+"""
+
+import argparse
+import re
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+SEED_DATA_SQL = ROOT / "database" / "init" / "02_seed_data.sql"
+
+SCALES = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+# Same genders, ranges and amount distributions as the seed data
+GENDERS = ("男性", "女性")
+SALES_AMOUNT_RANGE = (20_000.0, 150_000.0)
+PURCHASE_AMOUNT_RANGE = (20_000.0, 100_000.0)
+AGE_RANGE = (18, 80)
+START_DATE = date(2023, 1, 1)
+DAYS = 730
+
+
+def seed_names(table: str) -> list[str]:
+    """Names inserted into a dimension table by 02_seed_data.sql."""
+    sql = SEED_DATA_SQL.read_text(encoding="utf-8")
+    match = re.search(rf"INSERT INTO {table} \(name\) VALUES(.*?);", sql, re.DOTALL)
+    if match is None:
+        raise ValueError(f"No seed rows for {table} in {SEED_DATA_SQL}")
+    return re.findall(r"'([^']*)'", match.group(1))
+
+
+def customer_rows_for(sales_rows: int) -> int:
+    return max(sales_rows // 10, 1)
+
+
+def generate_sales(rows: int, seed: int = 0, categories: Optional[list[str]] = None,
+                   regions: Optional[list[str]] = None) -> pd.DataFrame:
+    """Sales rows spread uniformly over DAYS days with the seed categories and regions."""
+    rng = np.random.default_rng(seed)
+    categories = categories or seed_names("categories")
+    regions = regions or seed_names("regions")
+
+    days = rng.integers(0, DAYS, rows)
+    low, high = SALES_AMOUNT_RANGE
+    return pd.DataFrame({
+        "date": np.datetime64(START_DATE, "D") + days.astype("timedelta64[D]"),
+        "sales": np.round(rng.uniform(low, high, rows), 2),
+        "category": pd.Categorical.from_codes(rng.integers(0, len(categories), rows), categories),
+        "region": pd.Categorical.from_codes(rng.integers(0, len(regions), rows), regions),
+    })
+
+
+def generate_customers(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Customers with ids 1..rows."""
+    rng = np.random.default_rng(seed + 1)
+    low, high = PURCHASE_AMOUNT_RANGE
+    return pd.DataFrame({
+        "customer_id": np.arange(1, rows + 1, dtype=np.int64),
+        "age": rng.integers(AGE_RANGE[0], AGE_RANGE[1] + 1, rows),
+        "gender": pd.Categorical.from_codes(rng.integers(0, len(GENDERS), rows), list(GENDERS)),
+        "purchase_amount": np.round(rng.uniform(low, high, rows), 2),
+        "satisfaction": rng.integers(1, 6, rows),
+    })
+
+
+def write_files(sales: pd.DataFrame, customers: pd.DataFrame, output: Path) -> tuple[Path, Path]:
+    """Write sales as CSV and customers as JSON Lines, the formats the ingestion reads."""
+    output.mkdir(parents=True, exist_ok=True)
+    sales_path = output / "sales_data.csv"
+    customers_path = output / "customer_data.jsonl"
+    sales.to_csv(sales_path, index=False, date_format="%Y-%m-%d")
+    customers.to_json(customers_path, orient="records", lines=True, force_ascii=False)
+    return sales_path, customers_path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate synthetic sales and customer files.")
+    parser.add_argument("--scale", choices=SCALES, default="10k",
+                        help="number of sales rows")
+    parser.add_argument("--customers", type=int, default=None,
+                        help="number of customers (default: a tenth of the sales rows)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed; the same seed always produces the same data")
+    parser.add_argument("--output", type=Path, default=Path("data/benchmark"),
+                        help="directory to write sales_data.csv and customer_data.jsonl to")
+    return parser.parse_args()
+
+
+def main(args: argparse.Namespace):
+    sales_rows = SCALES[args.scale]
+    customer_rows = args.customers or customer_rows_for(sales_rows)
+    sales_path, customers_path = write_files(
+        generate_sales(sales_rows, args.seed),
+        generate_customers(customer_rows, args.seed),
+        args.output,
+    )
+    print(f"Wrote {sales_rows:,} sales to {sales_path}", file=sys.stderr)
+    print(f"Wrote {customer_rows:,} customers to {customers_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(parse_args())
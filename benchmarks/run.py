@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Time the repositories, DataAnalysisUseCase methods and API routes end to end.
+Usage: python benchmarks/run.py [--backend postgres|sqlite] [--scale 10k|1m|10m] [--load] [--repeat N] [--output PATH]
+
+With --backend postgres the benchmarks run against DATABASE_URL; pass --load to
+replace its sales and customers with generated data first. With --backend sqlite
+a throwaway SQLite database is generated and the API serves aggregates from the
+in-memory snapshot, since the aggregate queries are PostgreSQL-specific; queries
+SQLite cannot run are reported with status "error".
+
+Results are written as JSON, to compare runs with benchmarks/compare.py.
+Needs the benchmark dependency group: uv run --group benchmark python benchmarks/run.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.generate import (  # noqa: E402
+    DAYS,
+    SCALES,
+    START_DATE,
+    customer_rows_for,
+    generate_customers,
+    generate_sales,
+    write_files,
+)
+
+INSERT_CHUNK_ROWS = 50_000
+
+
+@dataclass
+class Case:
+    group: str
+    name: str
+    run: Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class Result:
+    group: str
+    name: str
+    status: str
+    rows: Optional[int] = None
+    seconds: list[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def summary(self) -> dict:
+        content = asdict(self)
+        if self.seconds:
+            content.update(
+                min=min(self.seconds),
+                median=statistics.median(self.seconds),
+                mean=statistics.fmean(self.seconds),
+                max=max(self.seconds),
+            )
+        return content
+
+
+def configure_environment(args: argparse.Namespace, workdir: Path):
+    """Settings read at import time by src.infrastructure, so this runs before importing it."""
+    if args.backend == "sqlite":
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir / 'benchmark.sqlite3'}"
+        os.environ.pop("DATABASE_READ_URL", None)
+        os.environ["SNAPSHOT_ENABLED"] = "true"
+    elif args.snapshot:
+        os.environ["SNAPSHOT_ENABLED"] = "true"
+    if not args.cache:
+        # Measure the queries, not cache hits from the previous repetition
+        os.environ["RESULT_CACHE_MAX_ENTRIES"] = "0"
+
+
+# Filter sets exercised by every benchmark; "filtered" selects the last quarter
+# of the generated dates for one category and two regions.
+def filter_cases() -> dict[str, dict]:
+    end = START_DATE + timedelta(days=DAYS - 1)
+    start = end - timedelta(days=89)
+    return {
+        "all": {},
+        "filtered": {
+            "date_range": [start.isoformat(), end.isoformat()],
+            "categories": ["電子機器"],
+            "regions": ["東京", "大阪"],
+            "age_range": [30, 50],
+            "satisfaction_filter": "高満足度 (4-5)",
+        },
+    }
+
+
+def filter_criteria(body: dict):
+    from src.domain.models import FilterCriteria
+
+    criteria = dict(body)
+    if "date_range" in criteria:
+        criteria["date_range"] = tuple(datetime.fromisoformat(value) for value in criteria["date_range"])
+    if "age_range" in criteria:
+        criteria["age_range"] = tuple(criteria["age_range"])
+    return FilterCriteria(**criteria)
+
+
+async def load_postgres(sales, customers, workdir: Path) -> None:
+    """Replace sales and customers through the COPY ingestion the migration script uses."""
+    from sqlalchemy import text
+
+    from src.infrastructure.database import AsyncSessionLocal, engine
+    from src.infrastructure.ingestion import ingest_customers, ingest_sales
+    from src.infrastructure.repositories import PostgreSQLSalesRollupRepository
+
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "TRUNCATE sales, sales_daily_rollup, sales_rollup_dirty_dates, customers RESTART IDENTITY"
+        ))
+
+    sales_path, customers_path = write_files(sales, customers, workdir)
+    await ingest_sales(sales_path)
+    async with AsyncSessionLocal() as session:
+        await PostgreSQLSalesRollupRepository(session).refresh()
+    await ingest_customers(customers_path)
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE sales"))
+        await conn.execute(text("ANALYZE customers"))
+
+
+async def load_sqlite(sales, customers) -> None:
+    """Create the schema from the ORM models and insert the rows in chunks."""
+    from sqlalchemy import func, insert, select
+
+    from src.infrastructure.database import engine, init_database
+    from src.infrastructure.models import (
+        Category,
+        Customer,
+        Region,
+        Sales,
+        SalesDailyRollup,
+    )
+
+    await init_database()
+    async with engine.begin() as conn:
+        categories = list(sales["category"].cat.categories)
+        regions = list(sales["region"].cat.categories)
+        await conn.execute(insert(Category), [{"name": name} for name in categories])
+        await conn.execute(insert(Region), [{"name": name} for name in regions])
+        category_ids = dict((await conn.execute(select(Category.name, Category.id))).all())
+        region_ids = dict((await conn.execute(select(Region.name, Region.id))).all())
+
+        for start in range(0, len(sales), INSERT_CHUNK_ROWS):
+            chunk = sales.iloc[start:start + INSERT_CHUNK_ROWS]
+            await conn.execute(insert(Sales), [
+                {"date": sale_date, "sales": amount, "category_id": category_ids[category], "region_id": region_ids[region]}
+                for sale_date, amount, category, region in zip(
+                    chunk["date"].dt.date.tolist(),
+                    chunk["sales"].tolist(),
+                    chunk["category"].tolist(),
+                    chunk["region"].tolist(),
+                )
+            ])
+
+        await conn.execute(insert(SalesDailyRollup).from_select(
+            ["date", "category_id", "region_id", "total", "count"],
+            select(Sales.date, Sales.category_id, Sales.region_id, func.sum(Sales.sales), func.count())
+            .group_by(Sales.date, Sales.category_id, Sales.region_id),
+        ))
+
+        for start in range(0, len(customers), INSERT_CHUNK_ROWS):
+            chunk = customers.iloc[start:start + INSERT_CHUNK_ROWS]
+            await conn.execute(insert(Customer), chunk.astype({"gender": str}).to_dict("records"))
+
+
+def repository_cases() -> list[Case]:
+    from src.config import DIContainer
+    from src.infrastructure.database import AsyncReadSessionLocal
+
+    async def on_repositories(call: Callable[[Any, Any], Awaitable[Any]]):
+        async with AsyncReadSessionLocal() as session:
+            container = DIContainer(db_session=session)
+            return await call(container.sales_repository, container.customer_repository)
+
+    async def consume(stream) -> int:
+        rows = 0
+        async for batch in stream:
+            rows += len(batch)
+        return rows
+
+    cases = []
+    for label, body in filter_cases().items():
+        filters = filter_criteria(body)
+        calls = {
+            "sales.get_sales_data": lambda sales, customers, f=filters: sales.get_sales_data(f),
+            "sales.stream_sales_batches": lambda sales, customers, f=filters: consume(sales.stream_sales_batches(f)),
+            "sales.get_sales_page": lambda sales, customers, f=filters: sales.get_sales_page(f),
+            "sales.count_sales": lambda sales, customers, f=filters: sales.count_sales(f),
+            "sales.get_sales_aggregates[day]": lambda sales, customers, f=filters: sales.get_sales_aggregates(f),
+            "sales.get_sales_aggregates[month]": lambda sales, customers, f=filters: sales.get_sales_aggregates(f, "month"),
+            "customers.get_customer_data": lambda sales, customers, f=filters: customers.get_customer_data(f),
+            "customers.stream_customer_batches": lambda sales, customers, f=filters: consume(customers.stream_customer_batches(f)),
+            "customers.get_customer_page": lambda sales, customers, f=filters: customers.get_customer_page(f),
+            "customers.count_customers": lambda sales, customers, f=filters: customers.count_customers(f),
+            "customers.get_customer_aggregates": lambda sales, customers, f=filters: customers.get_customer_aggregates(f),
+        }
+        for name, call in calls.items():
+            cases.append(Case("repositories", f"{name} ({label})", lambda call=call: on_repositories(call)))
+
+    for name, call in {
+        "sales.get_categories": lambda sales, customers: sales.get_categories(),
+        "sales.get_regions": lambda sales, customers: sales.get_regions(),
+        "sales.get_sales_range": lambda sales, customers: sales.get_sales_range(),
+        "customers.get_age_range": lambda sales, customers: customers.get_age_range(),
+        "customers.get_genders": lambda sales, customers: customers.get_genders(),
+    }.items():
+        cases.append(Case("repositories", name, lambda call=call: on_repositories(call)))
+    return cases
+
+
+def use_case_cases() -> list[Case]:
+    from src.config import DIContainer
+    from src.infrastructure.database import AsyncReadSessionLocal
+
+    async def on_use_case(call: Callable[[Any], Awaitable[Any]]):
+        async with AsyncReadSessionLocal() as session:
+            use_case = DIContainer(db_session=session, session_factory=AsyncReadSessionLocal).data_analysis_use_case
+            return await call(use_case)
+
+    cases = []
+    for label, body in filter_cases().items():
+        filters = filter_criteria(body)
+        calls = {
+            "get_filtered_sales_data": lambda use_case, f=filters: use_case.get_filtered_sales_data(f),
+            "get_filtered_customer_data": lambda use_case, f=filters: use_case.get_filtered_customer_data(f),
+            "get_metrics": lambda use_case, f=filters: use_case.get_metrics(f),
+            "get_chart_data[day]": lambda use_case, f=filters: use_case.get_chart_data(f),
+            "get_chart_data[week,500]": lambda use_case, f=filters: use_case.get_chart_data(f, "week", 500),
+            "get_dashboard": lambda use_case, f=filters: use_case.get_dashboard(f),
+        }
+        for name, call in calls.items():
+            cases.append(Case("use_cases", f"{name} ({label})", lambda call=call: on_use_case(call)))
+
+    cases.append(Case("use_cases", "get_filter_options", lambda: on_use_case(lambda use_case: use_case.get_filter_options())))
+    return cases
+
+
+def route_cases(client) -> list[Case]:
+    from backend.api.arrow import ARROW_STREAM_MEDIA_TYPE, arrow_available
+
+    async def request(method: str, path: str, body: Optional[dict] = None, headers: Optional[dict] = None) -> int:
+        response = await client.request(method, path, json=body, headers=headers)
+        response.raise_for_status()
+        return len(response.content)
+
+    cases = [
+        Case("routes", "GET /api/filter-options", lambda: request("GET", "/api/filter-options")),
+        Case("routes", "GET /api/stats/cache", lambda: request("GET", "/api/stats/cache")),
+        Case("routes", "GET /api/stats/pool", lambda: request("GET", "/api/stats/pool")),
+    ]
+    for label, body in filter_cases().items():
+        posts = {
+            "/api/sales": {},
+            "/api/sales?stream=ndjson": {},
+            "/api/customers": {},
+            "/api/customers?stream=ndjson": {},
+            "/api/sales/page": {},
+            "/api/customers/page": {},
+            "/api/metrics": {},
+            "/api/chart-data": {},
+            "/api/chart-data?granularity=week&max_points=500": {},
+            "/api/dashboard": {},
+        }
+        if arrow_available():
+            posts["/api/sales [arrow]"] = {"Accept": ARROW_STREAM_MEDIA_TYPE}
+            posts["/api/customers [arrow]"] = {"Accept": ARROW_STREAM_MEDIA_TYPE}
+        for name, headers in posts.items():
+            path = name.split(" ")[0]
+            cases.append(Case(
+                "routes",
+                f"POST {name} ({label})",
+                lambda path=path, body=body, headers=headers: request("POST", path, body, headers),
+            ))
+    return cases
+
+
+def row_count(value: Any) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if hasattr(value, "__len__"):
+        return len(value)
+    if hasattr(value, "items"):
+        return len(value.items)
+    return None
+
+
+async def measure(case: Case, repeat: int, warmup: int) -> Result:
+    try:
+        for _ in range(warmup):
+            await case.run()
+        seconds = []
+        value = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            value = await case.run()
+            seconds.append(time.perf_counter() - started)
+    except Exception as e:
+        return Result(case.group, case.name, "error", error=f"{type(e).__name__}: {e}".splitlines()[0])
+    return Result(case.group, case.name, "ok", rows=row_count(value), seconds=seconds)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(results: list[Result]):
+    for result in results:
+        if result.status == "ok":
+            median = statistics.median(result.seconds) * 1000
+            print(f"  {result.group:<13} {result.name:<60} {median:>10.2f} ms", file=sys.stderr)
+        else:
+            print(f"  {result.group:<13} {result.name:<60} {'error':>13}  {result.error}", file=sys.stderr)
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> dict:
+    import httpx
+
+    from backend.main import app
+    from src.infrastructure.database import engine
+
+    sales_rows = SCALES[args.scale]
+    customer_rows = args.customers or customer_rows_for(sales_rows)
+
+    load_seconds = None
+    if args.backend == "sqlite" or args.load:
+        print(f"Loading {sales_rows:,} sales and {customer_rows:,} customers...", file=sys.stderr)
+        started = time.perf_counter()
+        sales = generate_sales(sales_rows, args.seed)
+        customers = generate_customers(customer_rows, args.seed)
+        if args.backend == "sqlite":
+            await load_sqlite(sales, customers)
+        else:
+            await load_postgres(sales, customers, workdir)
+        load_seconds = time.perf_counter() - started
+        del sales, customers
+
+    results = []
+    # The lifespan loads the snapshot and closes the engine afterwards
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            cases = []
+            if "repositories" in args.groups:
+                cases += repository_cases()
+            if "use_cases" in args.groups:
+                cases += use_case_cases()
+            if "routes" in args.groups:
+                cases += route_cases(client)
+
+            for case in cases:
+                results.append(await measure(case, args.repeat, args.warmup))
+                print_summary(results[-1:])
+
+    from src.infrastructure.snapshot import SNAPSHOT_ENABLED
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "dialect": engine.dialect.name,
+            "scale": args.scale,
+            "sales_rows": sales_rows,
+            "customer_rows": customer_rows,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "snapshot": SNAPSHOT_ENABLED,
+            "cache": args.cache,
+            "load_seconds": load_seconds,
+        },
+        "results": [result.summary() for result in results],
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark repositories, use cases and API routes.")
+    parser.add_argument("--backend", choices=("postgres", "sqlite"), default="postgres",
+                        help="PostgreSQL at DATABASE_URL, or a generated in-process SQLite database")
+    parser.add_argument("--scale", choices=SCALES, default="10k",
+                        help="number of generated sales rows")
+    parser.add_argument("--customers", type=int, default=None,
+                        help="number of generated customers (default: a tenth of the sales rows)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the generated data")
+    parser.add_argument("--load", action="store_true",
+                        help="replace the PostgreSQL sales and customers with generated data first")
+    parser.add_argument("--groups", nargs="+", choices=("repositories", "use_cases", "routes"),
+                        default=["repositories", "use_cases", "routes"],
+                        help="which layers to benchmark")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="untimed runs per benchmark before timing")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="serve the use cases from the in-memory snapshot (always on for sqlite)")
+    parser.add_argument("--cache", action="store_true",
+                        help="keep the result cache enabled, timing cache hits after the first run")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="file to write the JSON results to (default: stdout)")
+    return parser.parse_args()
+
+
+def main(args: argparse.Namespace):
+    warnings.filterwarnings("ignore", message=".*Decimal objects natively.*")
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as workdir:
+        configure_environment(args, Path(workdir))
+        report = asyncio.run(run(args, Path(workdir)))
+
+    content = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(content + "\n", encoding="utf-8")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main(parse_args())
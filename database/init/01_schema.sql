@@ -42,6 +42,8 @@ CREATE INDEX idx_sales_category_id ON sales(category_id);
 CREATE INDEX idx_sales_region_id ON sales(region_id);
 CREATE INDEX idx_sales_date_category ON sales(date, category_id);
 CREATE INDEX idx_sales_date_region ON sales(date, region_id);
+CREATE INDEX idx_sales_date_id ON sales(date, id);
+CREATE INDEX idx_sales_sales ON sales(sales);
 
 CREATE INDEX idx_customers_age ON customers(age);
 CREATE INDEX idx_customers_gender ON customers(gender);
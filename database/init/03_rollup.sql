@@ -0,0 +1,73 @@
+-- Daily sales rollup for dashboard aggregations
+-- PostgreSQL 16 compatible
+
+-- Create pre-aggregated daily sales table
+CREATE TABLE sales_daily_rollup (
+    date DATE NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    region_id INTEGER NOT NULL REFERENCES regions(id),
+    total DECIMAL(16,2) NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (date, category_id, region_id)
+);
+
+-- Dates whose rollup rows are stale and must be recomputed
+CREATE TABLE sales_rollup_dirty_dates (
+    date DATE PRIMARY KEY
+);
+
+CREATE INDEX idx_sales_daily_rollup_category ON sales_daily_rollup(category_id);
+CREATE INDEX idx_sales_daily_rollup_region ON sales_daily_rollup(region_id);
+
+-- Mark every date touched by a statement on sales as dirty
+CREATE OR REPLACE FUNCTION mark_sales_rollup_dirty() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO sales_rollup_dirty_dates (date)
+        SELECT DISTINCT date FROM new_rows
+        ON CONFLICT DO NOTHING;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO sales_rollup_dirty_dates (date)
+        SELECT DISTINCT date FROM old_rows
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_sales_rollup_insert
+    AFTER INSERT ON sales
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_sales_rollup_dirty();
+
+CREATE TRIGGER trg_sales_rollup_update
+    AFTER UPDATE ON sales
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_sales_rollup_dirty();
+
+CREATE TRIGGER trg_sales_rollup_delete
+    AFTER DELETE ON sales
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_sales_rollup_dirty();
+
+-- Create view for rollup queries, mirroring sales_with_details
+CREATE VIEW sales_daily_rollup_with_details AS
+SELECT 
+    sr.date,
+    c.name as category,
+    r.name as region,
+    sr.total,
+    sr.count
+FROM sales_daily_rollup sr
+JOIN categories c ON sr.category_id = c.id
+JOIN regions r ON sr.region_id = r.id;
+
+-- Populate the rollup from the seed data
+INSERT INTO sales_daily_rollup (date, category_id, region_id, total, count)
+SELECT date, category_id, region_id, SUM(sales), COUNT(*)
+FROM sales
+GROUP BY date, category_id, region_id;
+
+-- Grant permissions
+GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO postgres;
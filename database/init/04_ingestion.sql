@@ -0,0 +1,20 @@
+-- Ingestion bookkeeping for incremental and resumable loads
+-- PostgreSQL 16 compatible
+
+-- Create per-source watermark table
+CREATE TABLE ingestion_watermarks (
+    source VARCHAR(500) PRIMARY KEY,
+    checksum VARCHAR(64),
+    -- Byte offset for CSV/JSON Lines sources, record index for JSON arrays
+    position BIGINT NOT NULL DEFAULT 0,
+    rows_loaded BIGINT NOT NULL DEFAULT 0,
+    max_date DATE,
+    -- Rows committed but not yet announced to the API, and the sales dates they cover
+    pending_rows BIGINT NOT NULL DEFAULT 0,
+    pending_min_date DATE,
+    pending_max_date DATE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Grant permissions
+GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO postgres;
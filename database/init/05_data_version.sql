@@ -0,0 +1,14 @@
+-- Data version validating cached API responses
+-- PostgreSQL 16 compatible
+
+-- Single-row counter bumped by every ingest that changes data
+CREATE TABLE data_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO data_version (id, version) VALUES (1, 0);
+
+-- Grant permissions
+GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO postgres;
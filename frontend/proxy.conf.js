@@ -0,0 +1,8 @@
+// The app calls the API at /api on its own origin, as behind nginx; ng serve forwards it
+module.exports = {
+  '/api': {
+    target: process.env.API_PROXY_TARGET || 'http://localhost:8000',
+    secure: false,
+    changeOrigin: true,
+  },
+};
@@ -3,7 +3,7 @@ import { CommonModule } from '@angular/common';
 import { MatCardModule } from '@angular/material/card';
 import { NgChartsModule } from 'ng2-charts';
 import { Chart, ChartConfiguration, ChartType, registerables } from 'chart.js';
-import { ChartData } from '../../models/data.models';
+import { ChartData, HistogramBin } from '../../models/data.models';
 
 Chart.register(...registerables);
 
@@ -311,15 +311,15 @@ export class ChartsComponent implements OnChanges {
     }
   }
 
-  private createHistogramBins(ages: number[]) {
+  private createHistogramBins(ageCounts: HistogramBin[]) {
     const bins: { [key: string]: number } = {};
     const binSize = 5;
     
-    ages.forEach(age => {
+    ageCounts.forEach(({ age, count }) => {
       const binStart = Math.floor(age / binSize) * binSize;
       const binEnd = binStart + binSize - 1;
       const binLabel = `${binStart}-${binEnd}`;
-      bins[binLabel] = (bins[binLabel] || 0) + 1;
+      bins[binLabel] = (bins[binLabel] || 0) + count;
     });
 
     return {
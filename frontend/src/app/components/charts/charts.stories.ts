@@ -44,9 +44,12 @@ const sampleChartData: ChartData = {
     { x: '札幌', y: 1500000 },
   ],
   histogram: [
-    25, 28, 32, 45, 38, 29, 35, 42, 31, 27,
-    39, 44, 33, 26, 41, 36, 30, 48, 34, 40,
-    37, 43, 29, 31, 46, 35, 33, 28, 42, 39
+    { age: 25, count: 1 }, { age: 26, count: 1 }, { age: 27, count: 1 }, { age: 28, count: 2 },
+    { age: 29, count: 2 }, { age: 30, count: 1 }, { age: 31, count: 2 }, { age: 32, count: 1 },
+    { age: 33, count: 2 }, { age: 34, count: 1 }, { age: 35, count: 2 }, { age: 36, count: 1 },
+    { age: 37, count: 1 }, { age: 38, count: 1 }, { age: 39, count: 2 }, { age: 40, count: 1 },
+    { age: 41, count: 1 }, { age: 42, count: 2 }, { age: 43, count: 1 }, { age: 44, count: 1 },
+    { age: 45, count: 1 }, { age: 46, count: 1 }, { age: 48, count: 1 }
   ]
 };
 
@@ -90,7 +93,7 @@ export const HighVolumeData: Story = {
         { x: '広島', y: 12000000 },
         { x: '仙台', y: 10000000 },
       ],
-      histogram: Array.from({ length: 200 }, () => Math.floor(Math.random() * 65) + 18)
+      histogram: Array.from({ length: 65 }, (_, i) => ({ age: i + 18, count: Math.floor(Math.random() * 10) + 1 }))
     },
   },
 };
@@ -111,7 +114,11 @@ export const MinimalData: Story = {
         { x: '東京', y: 120000 },
         { x: '大阪', y: 65000 },
       ],
-      histogram: [25, 30, 35, 28, 32, 29, 31, 33, 27, 36]
+      histogram: [
+        { age: 25, count: 1 }, { age: 27, count: 1 }, { age: 28, count: 1 }, { age: 29, count: 1 },
+        { age: 30, count: 1 }, { age: 31, count: 1 }, { age: 32, count: 1 }, { age: 33, count: 1 },
+        { age: 35, count: 1 }, { age: 36, count: 1 }
+      ]
     },
   },
 };
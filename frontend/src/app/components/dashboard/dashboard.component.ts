@@ -17,6 +17,9 @@ import {
   ChartData 
 } from '../../models/data.models';
 
+// Upper bound on line chart points so long date ranges stay cheap to render
+const LINE_CHART_MAX_POINTS = 500;
+
 @Component({
   selector: 'app-dashboard',
   standalone: true,
@@ -159,18 +162,17 @@ export class DashboardComponent implements OnInit, OnDestroy {
           return combineLatest([
             this.dataService.getSalesData(filters),
             this.dataService.getCustomerData(filters),
-            this.dataService.getMetrics(filters),
-            this.dataService.getChartData(filters)
+            this.dataService.getDashboard(filters, { max_points: LINE_CHART_MAX_POINTS })
           ]);
         }),
         takeUntil(this.destroy$)
       )
       .subscribe({
-        next: ([salesData, customerData, metrics, chartData]) => {
+        next: ([salesData, customerData, dashboard]) => {
           this.salesData = salesData;
           this.customerData = customerData;
-          this.metrics = metrics;
-          this.chartData = chartData;
+          this.metrics = dashboard.metrics;
+          this.chartData = dashboard.chart_data;
         },
         error: (error) => {
           console.error('Error loading dashboard data:', error);
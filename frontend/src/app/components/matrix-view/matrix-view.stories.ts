@@ -87,7 +87,10 @@ const sampleChartData: ChartData = {
     { x: '東京', y: 4500000 },
     { x: '大阪', y: 3200000 },
   ],
-  histogram: [25, 30, 35, 40, 45]
+  histogram: [
+    { age: 25, count: 1 }, { age: 30, count: 1 }, { age: 35, count: 1 }, { age: 40, count: 1 },
+    { age: 45, count: 1 }
+  ]
 };
 
 export const Default: Story = {
@@ -21,6 +21,7 @@ export interface FilterRequest {
   age_range?: [number, number];
   genders?: string[];
   satisfaction_filter?: string;
+  approximate?: boolean;
 }
 
 export interface Metrics {
@@ -28,18 +29,38 @@ export interface Metrics {
   avg_daily_sales: number;
   total_customers: number;
   avg_satisfaction: number;
+  sample_fraction?: number;
+  total_sales_error?: number;
+  avg_daily_sales_error?: number;
 }
 
 export interface ChartDataPoint {
   x: string;
   y: number;
+  error?: number;
+}
+
+export interface HistogramBin {
+  age: number;
+  count: number;
 }
 
 export interface ChartData {
   line_chart: ChartDataPoint[];
   pie_chart: ChartDataPoint[];
   bar_chart: ChartDataPoint[];
-  histogram: number[];
+  histogram: HistogramBin[];
+  sample_fraction?: number;
+}
+
+export interface ChartOptions {
+  granularity?: 'day' | 'week' | 'month' | 'quarter';
+  max_points?: number;
+}
+
+export interface Dashboard {
+  metrics: Metrics;
+  chart_data: ChartData;
 }
 
 export interface FilterOptions {
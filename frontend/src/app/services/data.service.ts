@@ -1,5 +1,5 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable, BehaviorSubject } from 'rxjs';
 import { 
   SalesData, 
@@ -7,6 +7,8 @@ import {
   FilterRequest, 
   Metrics, 
   ChartData, 
+  ChartOptions,
+  Dashboard,
   FilterOptions 
 } from '../models/data.models';
 
@@ -14,7 +16,7 @@ import {
   providedIn: 'root'
 })
 export class DataService {
-  private readonly apiUrl = 'http://localhost:8000/api';
+  private readonly apiUrl = '/api';
   private filtersSubject = new BehaviorSubject<FilterRequest>({});
   
   public filters$ = this.filtersSubject.asObservable();
@@ -37,8 +39,27 @@ export class DataService {
     return this.http.post<Metrics>(`${this.apiUrl}/metrics`, filters);
   }
 
-  getChartData(filters: FilterRequest): Observable<ChartData> {
-    return this.http.post<ChartData>(`${this.apiUrl}/chart-data`, filters);
+  getChartData(filters: FilterRequest, options: ChartOptions = {}): Observable<ChartData> {
+    return this.http.post<ChartData>(`${this.apiUrl}/chart-data`, filters, {
+      params: this.chartParams(options)
+    });
+  }
+
+  getDashboard(filters: FilterRequest, options: ChartOptions = {}): Observable<Dashboard> {
+    return this.http.post<Dashboard>(`${this.apiUrl}/dashboard`, filters, {
+      params: this.chartParams(options)
+    });
+  }
+
+  private chartParams(options: ChartOptions): HttpParams {
+    let params = new HttpParams();
+    if (options.granularity) {
+      params = params.set('granularity', options.granularity);
+    }
+    if (options.max_points) {
+      params = params.set('max_points', options.max_points);
+    }
+    return params;
   }
 
   updateFilters(filters: FilterRequest): void {
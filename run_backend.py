@@ -1,19 +1,78 @@
 #!/usr/bin/env python3
 """
-Simple script to run the FastAPI backend for testing
+Script to run the FastAPI backend, reloading on changes or with production workers.
+Usage: python run_backend.py [--production] [--workers N] [--host HOST] [--port PORT]
+
+In production mode uvicorn supervises the worker processes: it replaces
+workers that die, SIGHUP restarts them one at a time and SIGTTIN/SIGTTOU
+add or remove a worker.
 """
-import sys
+import argparse
 import os
+import sys
+import tempfile
+from pathlib import Path
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the FastAPI backend.")
+    parser.add_argument("--production", action="store_true",
+                        help="run worker processes without reload")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+                        help="worker processes in production mode (default: WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="seconds a stopping worker may spend finishing its requests")
+    parser.add_argument("--max-requests", type=int, default=None,
+                        help="restart a worker after it has served this many requests")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
     import uvicorn
-    from backend.main import app
-    
+
+    args = parse_args()
+
     print("Starting FastAPI backend...")
-    print("API Documentation: http://localhost:8000/docs")
-    print("Backend API: http://localhost:8000")
-    
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    print(f"API Documentation: http://localhost:{args.port}/docs")
+    print(f"Backend API: http://localhost:{args.port}")
+
+    if not args.production:
+        uvicorn.run("backend.main:app", host=args.host, port=args.port, reload=True)
+        sys.exit(0)
+
+    # Workers inherit the environment, so without a configured shared cache they all
+    # open the same file, which is removed when this launch ends
+    cache_file = None
+    if args.workers > 1 and not os.getenv("SHARED_CACHE_URL"):
+        cache_file = Path(tempfile.gettempdir()) / f"data-analysis-result-cache-{os.getpid()}.sqlite3"
+        os.environ["SHARED_CACHE_URL"] = f"sqlite:///{cache_file}"
+
+    # Every worker starts its own executor pools, so unless they are sized explicitly
+    # the workers split the CPUs rather than each sizing its pools for all of them
+    if args.workers > 1:
+        cpus_per_worker = max(1, (os.cpu_count() or 1) // args.workers)
+        os.environ.setdefault("EXECUTOR_THREADS", str(min(4, cpus_per_worker)))
+        os.environ.setdefault("EXECUTOR_PROCESSES", str(min(2, cpus_per_worker - 1)))
+
+    print(f"Workers: {args.workers}, shared cache: {os.getenv('SHARED_CACHE_URL') or 'none'}")
+    print(f"Executor per worker: {os.getenv('EXECUTOR_THREADS') or 'default'} threads, "
+          f"{os.getenv('EXECUTOR_PROCESSES') or 'default'} processes")
+
+    try:
+        uvicorn.run(
+            "backend.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            timeout_graceful_shutdown=args.graceful_timeout,
+            limit_max_requests=args.max_requests,
+        )
+    finally:
+        if cache_file is not None:
+            for path in (cache_file, Path(f"{cache_file}-wal"), Path(f"{cache_file}-shm")):
+                path.unlink(missing_ok=True)
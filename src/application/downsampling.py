@@ -0,0 +1,44 @@
+from typing import List, Sequence
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Pick at most threshold points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into threshold - 2 buckets, and from each bucket the point forming
+    the largest triangle with the previously kept point and the average of
+    the next bucket is kept, which preserves peaks and troughs.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    selected = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        next_count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / next_count
+        avg_y = sum(ys[next_start:next_end]) / next_count
+
+        prev_x, prev_y = xs[previous], ys[previous]
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs(
+                (prev_x - avg_x) * (ys[i] - prev_y)
+                - (prev_x - xs[i]) * (avg_y - prev_y)
+            )
+            if area > best_area:
+                best, best_area = i, area
+
+        selected.append(best)
+        previous = best
+
+    selected.append(n - 1)
+    return selected
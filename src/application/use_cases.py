@@ -1,143 +1,402 @@
+import asyncio
+from dataclasses import replace
 from datetime import datetime
-from typing import List
-
-import pandas as pd
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    TypeVar,
+)
 
+from src.application.downsampling import lttb_indices
 from src.domain.models import (
     ChartData,
+    CustomerAggregates,
+    CustomerBatch,
     CustomerData,
+    DashboardData,
     FilterCriteria,
+    FilterOptions,
+    Page,
+    SalesAggregates,
+    SalesBatch,
     SalesData,
+    SalesErrorBounds,
     SalesMetrics,
 )
+from src.infrastructure.cache import ResultCache, filter_cache_key, filter_date_range
+from src.infrastructure.executor import AnalyticsExecutor
 from src.infrastructure.repositories import CustomerRepository, SalesRepository
+from src.infrastructure.shared_cache import SharedResultCache
+from src.infrastructure.singleflight import SingleFlight
+from src.infrastructure.snapshot import SnapshotStore
+from src.infrastructure.tracing import traced
+
+SalesResult = TypeVar("SalesResult")
+CustomerResult = TypeVar("CustomerResult")
+Repository = TypeVar("Repository")
+Result = TypeVar("Result")
+
 
+def _exact_error_bounds(aggregates: SalesAggregates) -> SalesAggregates:
+    """Report exact aggregates as an estimate from the whole table, with no error."""
+    return replace(aggregates, error_bounds=SalesErrorBounds(
+        sample_fraction=1.0,
+        total_sales=0.0,
+        avg_sales=0.0,
+        by_date={key: 0.0 for key, _ in aggregates.by_date},
+        by_category={key: 0.0 for key, _ in aggregates.by_category},
+        by_region={key: 0.0 for key, _ in aggregates.by_region},
+    ))
 
+
+@traced("use_case")
 class DataAnalysisUseCase:
     def __init__(
         self, 
         sales_repository: SalesRepository,
-        customer_repository: CustomerRepository
+        customer_repository: CustomerRepository,
+        cache: Optional[ResultCache] = None,
+        snapshot_store: Optional[SnapshotStore] = None,
+        sales_repository_scope: Optional[Callable[[], AsyncContextManager[SalesRepository]]] = None,
+        customer_repository_scope: Optional[Callable[[], AsyncContextManager[CustomerRepository]]] = None,
+        single_flight: Optional[SingleFlight] = None,
+        shared_cache: Optional[SharedResultCache] = None,
+        executor: Optional[AnalyticsExecutor] = None
     ):
         self.sales_repository = sales_repository
         self.customer_repository = customer_repository
+        self.cache = cache
+        self.snapshot_store = snapshot_store
+        self.sales_repository_scope = sales_repository_scope
+        self.customer_repository_scope = customer_repository_scope
+        self.single_flight = single_flight
+        self.shared_cache = shared_cache
+        self.executor = executor
+
+    @property
+    def snapshot(self):
+        return self.snapshot_store.current if self.snapshot_store else None
+
+    async def get_filtered_sales_data(self, filters: FilterCriteria) -> SalesBatch:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return await self._in_thread(snapshot.sales_data, filters)
+        return await self.sales_repository.get_sales_data(filters)
+
+    async def get_filtered_customer_data(self, filters: FilterCriteria) -> CustomerBatch:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return await self._in_thread(snapshot.customer_data, filters)
+        return await self.customer_repository.get_customer_data(filters)
+
+    async def stream_filtered_sales_data(self, filters: FilterCriteria) -> AsyncIterator[SalesData]:
+        async for batch in self.stream_filtered_sales_batches(filters):
+            for sale in batch:
+                yield sale
+
+    async def stream_filtered_customer_data(self, filters: FilterCriteria) -> AsyncIterator[CustomerData]:
+        async for batch in self.stream_filtered_customer_batches(filters):
+            for customer in batch:
+                yield customer
+
+    async def stream_filtered_sales_batches(self, filters: FilterCriteria) -> AsyncIterator[SalesBatch]:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            for batch in snapshot.iter_sales_batches(filters):
+                yield batch
+            return
+        
+        async for batch in self.sales_repository.stream_sales_batches(filters):
+            yield batch
+
+    async def stream_filtered_customer_batches(self, filters: FilterCriteria) -> AsyncIterator[CustomerBatch]:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            for batch in snapshot.iter_customer_batches(filters):
+                yield batch
+            return
+        
+        async for batch in self.customer_repository.stream_customer_batches(filters):
+            yield batch
+
+    async def get_sales_page(
+        self,
+        filters: FilterCriteria,
+        page_size: int,
+        cursor: Optional[str] = None,
+        sort_by: str = "date",
+        descending: bool = True
+    ) -> Page[SalesData]:
+        page = await self.sales_repository.get_sales_page(filters, page_size, cursor, sort_by, descending)
+        total_count = await self._cached(
+            "sales-count",
+            filters,
+            lambda filters: self._in_scope(
+                self.sales_repository_scope,
+                self.sales_repository,
+                lambda repository: repository.count_sales(filters)
+            )
+        )
+        return replace(page, total_count=total_count)
+
+    async def get_customer_page(
+        self,
+        filters: FilterCriteria,
+        page_size: int,
+        cursor: Optional[str] = None,
+        sort_by: str = "customer_id",
+        descending: bool = False
+    ) -> Page[CustomerData]:
+        page = await self.customer_repository.get_customer_page(filters, page_size, cursor, sort_by, descending)
+        total_count = await self._cached(
+            "customers-count",
+            filters,
+            lambda filters: self._in_scope(
+                self.customer_repository_scope,
+                self.customer_repository,
+                lambda repository: repository.count_customers(filters)
+            )
+        )
+        return replace(page, total_count=total_count)
+
+    async def get_metrics(self, filters: FilterCriteria) -> SalesMetrics:
+        return await self._cached("metrics", filters, self._compute_metrics)
+
+    async def get_chart_data(
+        self,
+        filters: FilterCriteria,
+        granularity: str = "day",
+        max_points: Optional[int] = None
+    ) -> ChartData:
+        chart_data = await self._cached(
+            f"chart-data:{granularity}",
+            filters,
+            lambda filters: self._compute_chart_data(filters, granularity)
+        )
+        return await self.downsample_chart_data(chart_data, max_points)
+
+    async def get_dashboard(
+        self,
+        filters: FilterCriteria,
+        granularity: str = "day",
+        max_points: Optional[int] = None
+    ) -> DashboardData:
+        dashboard = await self._cached(
+            f"dashboard:{granularity}",
+            filters,
+            lambda filters: self._compute_dashboard(filters, granularity)
+        )
+        return replace(dashboard, chart_data=await self.downsample_chart_data(dashboard.chart_data, max_points))
+
+    async def get_filter_options(self) -> FilterOptions:
+        return await self._cached("filter-options", None, self._compute_filter_options)
+
+    async def _cached(
+        self,
+        endpoint: str,
+        filters: Optional[FilterCriteria],
+        compute: Callable[[Optional[FilterCriteria]], Awaitable[Any]]
+    ) -> Any:
+        """Serve a result from the caches, or compute it once for all concurrent identical requests."""
+        key = filter_cache_key(endpoint, filters)
+        if self.cache is not None:
+            result = self.cache.get(key)
+            if result is not None:
+                return result
+        
+        async def compute_and_store() -> Any:
+            generation = self.cache.generation() if self.cache is not None else None
+            if self.shared_cache is not None:
+                # Another worker process may already have computed it
+                result = await self.shared_cache.get_or_compute(key, lambda: compute(filters))
+            else:
+                result = await compute(filters)
+            if self.cache is not None:
+                self.cache.set(key, result, filter_date_range(filters), generation)
+            return result
+        
+        if self.single_flight is None:
+            return await compute_and_store()
+        return await self.single_flight.do(key, compute_and_store)
+
+    async def _in_scope(
+        self,
+        scope: Optional[Callable[[], AsyncContextManager[Repository]]],
+        repository: Repository,
+        fetch: Callable[[Repository], Awaitable[Result]]
+    ) -> Result:
+        # Coalesced computations outlive the request that started them, so they use their own session
+        if scope is None:
+            return await fetch(repository)
+        async with scope() as scoped_repository:
+            return await fetch(scoped_repository)
+
+    async def _in_thread(self, fn: Callable[..., Result], *args: Any) -> Result:
+        # NumPy work over the snapshot mostly releases the GIL, so threads run it in parallel
+        if self.executor is None:
+            return fn(*args)
+        return await self.executor.run_in_thread(fn, *args)
 
-    async def get_filtered_sales_data(self, filters: FilterCriteria) -> List[SalesData]:
-        sales_data = await self.sales_repository.get_sales_data()
+    async def _in_process(self, fn: Callable[..., Result], *args: Any) -> Result:
+        # Pure-Python loops hold the GIL, so they only stop blocking requests in another process
+        if self.executor is None:
+            return fn(*args)
+        return await self.executor.run_in_process(fn, *args)
+
+    async def _get_aggregates(
+        self, filters: FilterCriteria, granularity: str = "day"
+    ) -> tuple[SalesAggregates, CustomerAggregates]:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            sales_aggregates, customer_aggregates = await asyncio.gather(
+                self._in_thread(snapshot.aggregate_sales, filters, granularity),
+                self._in_thread(snapshot.aggregate_customers, filters)
+            )
+        else:
+            sales_aggregates, customer_aggregates = await self._fetch_sales_and_customers(
+                lambda repository: repository.get_sales_aggregates(filters, granularity),
+                lambda repository: repository.get_customer_aggregates(filters)
+            )
         
-        if not filters:
-            return sales_data
+        # Estimates were asked for, so say how the answer was computed even when it is exact
+        if filters is not None and filters.approximate and sales_aggregates.error_bounds is None:
+            sales_aggregates = _exact_error_bounds(sales_aggregates)
+        return sales_aggregates, customer_aggregates
+
+    async def _fetch_sales_and_customers(
+        self,
+        fetch_sales: Callable[[SalesRepository], Awaitable[SalesResult]],
+        fetch_customers: Callable[[CustomerRepository], Awaitable[CustomerResult]]
+    ) -> tuple[SalesResult, CustomerResult]:
+        """Run a sales and a customer query, concurrently when repository scopes are available.
+
+        Each concurrent query gets its own session, since a session cannot run
+        two statements at once. If either query fails the other is cancelled,
+        and cancelling the caller cancels both.
+        """
+        if self.sales_repository_scope is None or self.customer_repository_scope is None:
+            return await fetch_sales(self.sales_repository), await fetch_customers(self.customer_repository)
         
-        filtered_data = []
-        for sale in sales_data:
-            if self._matches_sales_filters(sale, filters):
-                filtered_data.append(sale)
+        async def run_in_scope(scope, fetch):
+            async with scope() as repository:
+                return await fetch(repository)
         
-        return filtered_data
+        try:
+            async with asyncio.TaskGroup() as group:
+                sales_task = group.create_task(run_in_scope(self.sales_repository_scope, fetch_sales))
+                customers_task = group.create_task(run_in_scope(self.customer_repository_scope, fetch_customers))
+        except ExceptionGroup as errors:
+            # Surface the first failure as-is so callers see the repository's own exception
+            raise errors.exceptions[0]
+        return sales_task.result(), customers_task.result()
 
-    async def get_filtered_customer_data(self, filters: FilterCriteria) -> List[CustomerData]:
-        customer_data = await self.customer_repository.get_customer_data()
+    async def _compute_metrics(self, filters: FilterCriteria) -> SalesMetrics:
+        sales_aggregates, customer_aggregates = await self._get_aggregates(filters)
         
-        if not filters:
-            return customer_data
+        return self.calculate_metrics_from_aggregates(sales_aggregates, customer_aggregates)
+
+    async def _compute_chart_data(self, filters: FilterCriteria, granularity: str = "day") -> ChartData:
+        sales_aggregates, customer_aggregates = await self._get_aggregates(filters, granularity)
         
-        filtered_data = []
-        for customer in customer_data:
-            if self._matches_customer_filters(customer, filters):
-                filtered_data.append(customer)
+        return self.generate_chart_data_from_aggregates(sales_aggregates, customer_aggregates)
+
+    async def _compute_dashboard(self, filters: FilterCriteria, granularity: str = "day") -> DashboardData:
+        # One fetch feeds both the metrics and the charts
+        sales_aggregates, customer_aggregates = await self._get_aggregates(filters, granularity)
         
-        return filtered_data
+        return DashboardData(
+            metrics=self.calculate_metrics_from_aggregates(sales_aggregates, customer_aggregates),
+            chart_data=self.generate_chart_data_from_aggregates(sales_aggregates, customer_aggregates),
+        )
 
-    def calculate_metrics(
-        self, 
-        sales_data: List[SalesData], 
-        customer_data: List[CustomerData]
+    async def _compute_filter_options(self, filters: Optional[FilterCriteria]) -> FilterOptions:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot.filter_options()
+        
+        async def customer_options(repository: CustomerRepository) -> tuple[tuple[int, int], List[str]]:
+            return await repository.get_age_range(), await repository.get_genders()
+        
+        async def sales_options(repository: SalesRepository) -> tuple[List[str], List[str], tuple[float, float]]:
+            return await repository.get_categories(), await repository.get_regions(), await repository.get_sales_range()
+        
+        (categories, regions, sales_range), (age_range, genders) = await self._fetch_sales_and_customers(
+            sales_options,
+            customer_options
+        )
+        
+        return FilterOptions(
+            categories=categories,
+            regions=regions,
+            sales_range=sales_range,
+            age_range=age_range,
+            genders=genders,
+        )
+
+    async def downsample_chart_data(self, chart_data: ChartData, max_points: Optional[int]) -> ChartData:
+        """Reduce the line chart to at most max_points points, keeping its shape."""
+        if not max_points or len(chart_data.line_chart_data) <= max_points:
+            return chart_data
+        
+        points = chart_data.line_chart_data
+        indices = await self._in_process(
+            lttb_indices,
+            [point_date.toordinal() for point_date, _ in points],
+            [sales for _, sales in points],
+            max_points
+        )
+        errors = chart_data.line_chart_errors
+        return replace(
+            chart_data,
+            line_chart_data=[points[i] for i in indices],
+            line_chart_errors=[errors[i] for i in indices] if errors is not None else None
+        )
+
+    def calculate_metrics_from_aggregates(
+        self,
+        sales_aggregates: SalesAggregates,
+        customer_aggregates: CustomerAggregates
     ) -> SalesMetrics:
-        total_sales = sum(sale.sales for sale in sales_data)
-        avg_daily_sales = total_sales / len(sales_data) if sales_data else 0
-        total_customers = len(customer_data)
-        avg_satisfaction = (
-            sum(customer.satisfaction for customer in customer_data) / len(customer_data)
-            if customer_data else 0
+        avg_daily_sales = (
+            sales_aggregates.total_sales / sales_aggregates.count
+            if sales_aggregates.count else 0
         )
         
-        return SalesMetrics(
-            total_sales=total_sales,
+        metrics = SalesMetrics(
+            total_sales=sales_aggregates.total_sales,
             avg_daily_sales=avg_daily_sales,
-            total_customers=total_customers,
-            avg_satisfaction=avg_satisfaction,
+            total_customers=customer_aggregates.count,
+            avg_satisfaction=customer_aggregates.avg_satisfaction,
         )
+        
+        error_bounds = sales_aggregates.error_bounds
+        if error_bounds is not None:
+            metrics.sample_fraction = error_bounds.sample_fraction
+            metrics.total_sales_error = error_bounds.total_sales
+            metrics.avg_daily_sales_error = error_bounds.avg_sales
+        return metrics
 
-    def generate_chart_data(
-        self, 
-        sales_data: List[SalesData], 
-        customer_data: List[CustomerData]
+    def generate_chart_data_from_aggregates(
+        self,
+        sales_aggregates: SalesAggregates,
+        customer_aggregates: CustomerAggregates
     ) -> ChartData:
-        df_sales = pd.DataFrame([
-            {"date": sale.date, "sales": sale.sales, "category": sale.category, "region": sale.region}
-            for sale in sales_data
-        ])
-        
-        line_chart_data = []
-        if not df_sales.empty:
-            daily_sales = df_sales.groupby("date")["sales"].sum()
-            line_chart_data = [(date, sales) for date, sales in daily_sales.items()]
-        
-        pie_chart_data = []
-        if not df_sales.empty:
-            category_sales = df_sales.groupby("category")["sales"].sum()
-            pie_chart_data = [(category, sales) for category, sales in category_sales.items()]
-        
-        bar_chart_data = []
-        if not df_sales.empty:
-            region_sales = df_sales.groupby("region")["sales"].sum()
-            bar_chart_data = [(region, sales) for region, sales in region_sales.items()]
-        
-        histogram_data = [customer.age for customer in customer_data] if customer_data else []
-        
-        return ChartData(
-            line_chart_data=line_chart_data,
-            pie_chart_data=pie_chart_data,
-            bar_chart_data=bar_chart_data,
-            histogram_data=histogram_data,
+        chart_data = ChartData(
+            line_chart_data=sales_aggregates.by_date,
+            pie_chart_data=sales_aggregates.by_category,
+            bar_chart_data=sales_aggregates.by_region,
+            histogram_data=customer_aggregates.age_counts,
         )
-
-    def _matches_sales_filters(self, sale: SalesData, filters: FilterCriteria) -> bool:
-        if filters.date_range:
-            sale_date = sale.date.date() if hasattr(sale.date, 'date') else sale.date
-            start_date = filters.date_range[0].date() if hasattr(filters.date_range[0], 'date') else filters.date_range[0]
-            end_date = filters.date_range[1].date() if hasattr(filters.date_range[1], 'date') else filters.date_range[1]
-            if not (start_date <= sale_date <= end_date):
-                return False
-        
-        if filters.categories and sale.category not in filters.categories:
-            return False
-        
-        if filters.regions and sale.region not in filters.regions:
-            return False
-        
-        if filters.sales_range and not (
-            filters.sales_range[0] <= sale.sales <= filters.sales_range[1]
-        ):
-            return False
-        
-        return True
-
-    def _matches_customer_filters(self, customer: CustomerData, filters: FilterCriteria) -> bool:
-        if filters.age_range and not (
-            filters.age_range[0] <= customer.age <= filters.age_range[1]
-        ):
-            return False
-        
-        if filters.genders and customer.gender not in filters.genders:
-            return False
-        
-        if filters.satisfaction_filter:
-            if filters.satisfaction_filter == "高満足度 (4-5)" and customer.satisfaction < 4:
-                return False
-            elif filters.satisfaction_filter == "中満足度 (3)" and customer.satisfaction != 3:
-                return False
-            elif filters.satisfaction_filter == "低満足度 (1-2)" and customer.satisfaction > 2:
-                return False
-        
-        return True
\ No newline at end of file
+        
+        error_bounds = sales_aggregates.error_bounds
+        if error_bounds is not None:
+            chart_data.sample_fraction = error_bounds.sample_fraction
+            chart_data.line_chart_errors = [error_bounds.by_date[key] for key, _ in sales_aggregates.by_date]
+            chart_data.pie_chart_errors = [error_bounds.by_category[key] for key, _ in sales_aggregates.by_category]
+            chart_data.bar_chart_errors = [error_bounds.by_region[key] for key, _ in sales_aggregates.by_region]
+        return chart_data
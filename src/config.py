@@ -1,15 +1,29 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.application.use_cases import DataAnalysisUseCase
+from src.infrastructure.cache import result_cache
+from src.infrastructure.dimensions import dimension_cache
+from src.infrastructure.executor import analytics_executor
 from src.infrastructure.repositories import (
     PostgreSQLCustomerRepository,
     PostgreSQLSalesRepository,
 )
+from src.infrastructure.shared_cache import shared_result_cache
+from src.infrastructure.singleflight import single_flight
+from src.infrastructure.snapshot import snapshot_store
 
 
 class DIContainer:
-    def __init__(self, db_session: AsyncSession):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        session_factory: Optional[Callable[[], AsyncSession]] = None
+    ):
         self._db_session = db_session
+        self._session_factory = session_factory
         self._sales_repository = None
         self._customer_repository = None
         self._data_analysis_use_case = None
@@ -17,7 +31,7 @@ class DIContainer:
     @property
     def sales_repository(self):
         if self._sales_repository is None:
-            self._sales_repository = PostgreSQLSalesRepository(self._db_session)
+            self._sales_repository = PostgreSQLSalesRepository(self._db_session, dimension_cache)
         return self._sales_repository
 
     @property
@@ -26,11 +40,30 @@ class DIContainer:
             self._customer_repository = PostgreSQLCustomerRepository(self._db_session)
         return self._customer_repository
 
+    @asynccontextmanager
+    async def sales_repository_scope(self) -> AsyncIterator[PostgreSQLSalesRepository]:
+        """A sales repository on its own session, for queries run concurrently."""
+        async with self._session_factory() as session:
+            yield PostgreSQLSalesRepository(session, dimension_cache)
+
+    @asynccontextmanager
+    async def customer_repository_scope(self) -> AsyncIterator[PostgreSQLCustomerRepository]:
+        """A customer repository on its own session, for queries run concurrently."""
+        async with self._session_factory() as session:
+            yield PostgreSQLCustomerRepository(session)
+
     @property
     def data_analysis_use_case(self):
         if self._data_analysis_use_case is None:
             self._data_analysis_use_case = DataAnalysisUseCase(
                 self.sales_repository,
-                self.customer_repository
+                self.customer_repository,
+                cache=result_cache,
+                snapshot_store=snapshot_store,
+                sales_repository_scope=self.sales_repository_scope if self._session_factory else None,
+                customer_repository_scope=self.customer_repository_scope if self._session_factory else None,
+                single_flight=single_flight if self._session_factory else None,
+                shared_cache=shared_result_cache,
+                executor=analytics_executor
             )
         return self._data_analysis_use_case
\ No newline at end of file
@@ -1,9 +1,26 @@
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Generic, Iterable, Iterator, List, Optional, TypeVar
 
+T = TypeVar("T")
 
-@dataclass
+# Batches store dates as days since the Unix epoch, like Arrow's date32 and numpy's datetime64[D]
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+SATISFACTION_RANGES = {
+    "高満足度 (4-5)": (4, 5),
+    "中満足度 (3)": (3, 3),
+    "低満足度 (1-2)": (1, 2),
+}
+
+# Time buckets the line chart can be aggregated to, named as in PostgreSQL's date_trunc
+GRANULARITIES = ("day", "week", "month", "quarter")
+
+
+@dataclass(frozen=True, slots=True)
 class SalesData:
     date: datetime
     sales: float
@@ -11,7 +28,7 @@ class SalesData:
     region: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CustomerData:
     customer_id: int
     age: int
@@ -20,6 +37,144 @@ class CustomerData:
     satisfaction: int
 
 
+def _dictionary_encode(values: Iterable[str]) -> tuple[array, tuple[str, ...]]:
+    codes: dict[str, int] = {}
+    encoded = array("i", [codes.setdefault(value, len(codes)) for value in values])
+    return encoded, tuple(codes)
+
+
+# A whole result set held as typed arrays instead of one object per row.
+# Strings are dictionary encoded: each row stores a code into the labels tuple.
+# Indexing and iterating yield SalesData, so a batch can stand in for a list of rows.
+@dataclass(frozen=True, slots=True)
+class SalesBatch(Sequence):
+    days: array
+    sales: array
+    category_codes: array
+    categories: tuple[str, ...]
+    region_codes: array
+    regions: tuple[str, ...]
+
+    @classmethod
+    def from_columns(
+        cls,
+        dates: Iterable[date],
+        sales: Iterable[float],
+        categories: Iterable[str],
+        regions: Iterable[str],
+    ) -> "SalesBatch":
+        category_codes, category_labels = _dictionary_encode(categories)
+        region_codes, region_labels = _dictionary_encode(regions)
+        return cls(
+            days=array("i", [value.toordinal() - EPOCH_ORDINAL for value in dates]),
+            sales=array("d", sales),
+            category_codes=category_codes,
+            categories=category_labels,
+            region_codes=region_codes,
+            regions=region_labels,
+        )
+
+    def __len__(self) -> int:
+        return len(self.sales)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SalesBatch(
+                days=self.days[index],
+                sales=self.sales[index],
+                category_codes=self.category_codes[index],
+                categories=self.categories,
+                region_codes=self.region_codes[index],
+                regions=self.regions,
+            )
+        return SalesData(
+            date=date.fromordinal(EPOCH_ORDINAL + self.days[index]),
+            sales=self.sales[index],
+            category=self.categories[self.category_codes[index]],
+            region=self.regions[self.region_codes[index]],
+        )
+
+    def __iter__(self) -> Iterator[SalesData]:
+        # Rows share date objects; a batch spans few distinct days
+        dates: dict[int, date] = {}
+        categories, regions = self.categories, self.regions
+        for day, amount, category_code, region_code in zip(
+            self.days, self.sales, self.category_codes, self.region_codes
+        ):
+            sale_date = dates.get(day)
+            if sale_date is None:
+                sale_date = dates[day] = date.fromordinal(EPOCH_ORDINAL + day)
+            yield SalesData(
+                date=sale_date,
+                sales=amount,
+                category=categories[category_code],
+                region=regions[region_code],
+            )
+
+
+@dataclass(frozen=True, slots=True)
+class CustomerBatch(Sequence):
+    customer_ids: array
+    ages: array
+    gender_codes: array
+    genders: tuple[str, ...]
+    purchase_amounts: array
+    satisfaction: array
+
+    @classmethod
+    def from_columns(
+        cls,
+        customer_ids: Iterable[int],
+        ages: Iterable[int],
+        genders: Iterable[str],
+        purchase_amounts: Iterable[float],
+        satisfaction: Iterable[int],
+    ) -> "CustomerBatch":
+        gender_codes, gender_labels = _dictionary_encode(genders)
+        return cls(
+            customer_ids=array("q", customer_ids),
+            ages=array("i", ages),
+            gender_codes=gender_codes,
+            genders=gender_labels,
+            purchase_amounts=array("d", purchase_amounts),
+            satisfaction=array("i", satisfaction),
+        )
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CustomerBatch(
+                customer_ids=self.customer_ids[index],
+                ages=self.ages[index],
+                gender_codes=self.gender_codes[index],
+                genders=self.genders,
+                purchase_amounts=self.purchase_amounts[index],
+                satisfaction=self.satisfaction[index],
+            )
+        return CustomerData(
+            customer_id=self.customer_ids[index],
+            age=self.ages[index],
+            gender=self.genders[self.gender_codes[index]],
+            purchase_amount=self.purchase_amounts[index],
+            satisfaction=self.satisfaction[index],
+        )
+
+    def __iter__(self) -> Iterator[CustomerData]:
+        genders = self.genders
+        for customer_id, age, gender_code, purchase_amount, satisfaction in zip(
+            self.customer_ids, self.ages, self.gender_codes, self.purchase_amounts, self.satisfaction
+        ):
+            yield CustomerData(
+                customer_id=customer_id,
+                age=age,
+                gender=genders[gender_code],
+                purchase_amount=purchase_amount,
+                satisfaction=satisfaction,
+            )
+
+
 @dataclass
 class FilterCriteria:
     date_range: Optional[tuple[datetime, datetime]] = None
@@ -29,6 +184,7 @@ class FilterCriteria:
     age_range: Optional[tuple[int, int]] = None
     genders: Optional[List[str]] = None
     satisfaction_filter: Optional[str] = None
+    approximate: bool = False
 
 
 @dataclass
@@ -37,6 +193,10 @@ class SalesMetrics:
     avg_daily_sales: float
     total_customers: int
     avg_satisfaction: float
+    # Set only for results estimated from a sample; errors are 95% bounds
+    sample_fraction: Optional[float] = None
+    total_sales_error: Optional[float] = None
+    avg_daily_sales_error: Optional[float] = None
 
 
 @dataclass
@@ -44,4 +204,67 @@ class ChartData:
     line_chart_data: List[tuple[datetime, float]]
     pie_chart_data: List[tuple[str, float]]
     bar_chart_data: List[tuple[str, float]]
-    histogram_data: List[int]
\ No newline at end of file
+    # (age, number of customers) per distinct age
+    histogram_data: List[tuple[int, int]]
+    # Set only for results estimated from a sample; errors are 95% bounds per point
+    sample_fraction: Optional[float] = None
+    line_chart_errors: Optional[List[float]] = None
+    pie_chart_errors: Optional[List[float]] = None
+    bar_chart_errors: Optional[List[float]] = None
+
+
+@dataclass
+class DashboardData:
+    metrics: SalesMetrics
+    chart_data: ChartData
+
+
+@dataclass
+class FilterOptions:
+    categories: List[str]
+    regions: List[str]
+    sales_range: tuple[float, float]
+    age_range: tuple[int, int]
+    genders: List[str]
+
+
+@dataclass
+class SalesErrorBounds:
+    sample_fraction: float
+    total_sales: float
+    avg_sales: float
+    by_date: dict[datetime, float]
+    by_category: dict[str, float]
+    by_region: dict[str, float]
+
+
+@dataclass
+class SalesAggregates:
+    total_sales: float
+    count: int
+    by_date: List[tuple[datetime, float]]
+    by_category: List[tuple[str, float]]
+    by_region: List[tuple[str, float]]
+    error_bounds: Optional[SalesErrorBounds] = None
+
+
+@dataclass
+class CustomerAggregates:
+    count: int
+    avg_satisfaction: float
+    age_counts: List[tuple[int, int]]
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str]
+    total_count: Optional[int] = None
+
+
+@dataclass
+class DataChange:
+    tables: List[str]
+    date_range: Optional[tuple[date, date]] = None
+    # Data version after the change, when the sender bumped it
+    version: Optional[int] = None
@@ -0,0 +1,217 @@
+"""In-process result cache for analytics queries."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, fields
+from datetime import date
+from typing import Any, Optional
+
+from src.domain.models import FilterCriteria
+
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "512"))
+
+# Recent invalidations remembered to reject results computed before them
+INVALIDATION_LOG_SIZE = 64
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    size: int
+    max_entries: int
+    ttl_seconds: float
+
+
+def _canonical_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set)):
+        items = [_canonical_value(item) for item in value]
+        return sorted(items) if isinstance(value, (list, set)) else items
+    if hasattr(value, 'date'):
+        return value.date().isoformat()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def canonical_filters(filters: Optional[FilterCriteria]) -> dict:
+    """Normalize filters so that equivalent criteria compare equal.
+
+    Empty values and disabled flags are dropped, list filters are sorted and
+    dates are reduced to the day they select, matching how the repositories
+    apply them.
+    """
+    if not filters:
+        return {}
+
+    canonical = {}
+    for field in fields(filters):
+        value = getattr(filters, field.name)
+        if value is None or value is False or value == [] or value == ():
+            continue
+        canonical[field.name] = _canonical_value(value)
+    return canonical
+
+
+def filter_date_range(filters: Optional[FilterCriteria]) -> Optional[tuple[date, date]]:
+    """The sales dates a result for these filters depends on, or None for all dates."""
+    if not filters or not filters.date_range:
+        return None
+    start, end = filters.date_range
+    return (
+        start.date() if hasattr(start, 'date') else start,
+        end.date() if hasattr(end, 'date') else end,
+    )
+
+
+def _ranges_overlap(
+    first: Optional[tuple[date, date]], second: Optional[tuple[date, date]]
+) -> bool:
+    # None covers all dates
+    if first is None or second is None:
+        return True
+    return first[0] <= second[1] and second[0] <= first[1]
+
+
+def filter_cache_key(endpoint: str, filters: Optional[FilterCriteria]) -> str:
+    """Hash the endpoint and canonical filters into a cache key."""
+    payload = json.dumps(
+        [endpoint, canonical_filters(filters)],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Bounded LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Optional[tuple[date, date]], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._generation = 0
+        self._invalidation_log: deque[tuple[int, Optional[tuple[date, date]]]] = deque(
+            maxlen=INVALIDATION_LOG_SIZE
+        )
+
+    def generation(self) -> int:
+        """Counter bumped by every invalidation; read it before computing a value to set."""
+        with self._lock:
+            return self._generation
+
+    def _invalidated_since(self, generation: int, date_range: Optional[tuple[date, date]]) -> bool:
+        if generation >= self._generation:
+            return False
+        if not self._invalidation_log or self._invalidation_log[0][0] > generation + 1:
+            # The log no longer reaches back that far, so assume the worst
+            return True
+        return any(
+            invalidated_at > generation and _ranges_overlap(invalidated_range, date_range)
+            for invalidated_at, invalidated_range in self._invalidation_log
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, _, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        date_range: Optional[tuple[date, date]] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store a value, evicting the least recently used entries if full.
+
+        date_range records which sales dates the value was computed from, so
+        that ingesting other dates leaves it in place. None means all dates.
+        With the generation read before computing the value, it is dropped if
+        an overlapping invalidation happened meanwhile, since it may predate
+        the ingested data.
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and self._invalidated_since(generation, date_range):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, date_range, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, date_range: Optional[tuple[date, date]] = None) -> int:
+        """Drop entries after new data has been ingested.
+
+        With a date_range only entries whose own range overlaps it, or that
+        cover all dates, are dropped; otherwise every entry is.
+        """
+        with self._lock:
+            if date_range is None:
+                stale = list(self._entries)
+            else:
+                start, end = date_range
+                stale = [
+                    key
+                    for key, (_, entry_range, _) in self._entries.items()
+                    if entry_range is None or (entry_range[0] <= end and start <= entry_range[1])
+                ]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += 1
+            self._generation += 1
+            self._invalidation_log.append((self._generation, date_range))
+            return len(stale)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+                ttl_seconds=self.ttl_seconds,
+            )
+
+
+# Process-wide cache shared by every request
+result_cache = ResultCache()
@@ -0,0 +1,72 @@
+"""Monotonic data version that HTTP caches are validated against."""
+
+import os
+import threading
+from typing import Callable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.database import engine
+from src.infrastructure.models import DataVersion
+
+DATA_VERSION_ID = 1
+
+# Seconds between checks of the stored version, in case a notification was missed
+DATA_VERSION_POLL_SECONDS = float(os.getenv("DATA_VERSION_POLL_SECONDS", "30"))
+
+
+async def bump_data_version() -> int:
+    """Increment the stored version after an ingest and return the new value."""
+    async with engine.begin() as conn:
+        version = (await conn.execute(
+            update(DataVersion)
+            .where(DataVersion.id == DATA_VERSION_ID)
+            .values(version=DataVersion.version + 1, updated_at=func.current_timestamp())
+            .returning(DataVersion.version)
+        )).scalar_one_or_none()
+        if version is None:
+            # Databases created from the ORM metadata start without the row
+            version = 1
+            await conn.execute(DataVersion.__table__.insert().values(id=DATA_VERSION_ID, version=version))
+        return version
+
+
+async def read_data_version(session_factory: Callable[[], AsyncSession]) -> int:
+    """The stored version, without moving this process to it."""
+    async with session_factory() as session:
+        version = (await session.execute(
+            select(DataVersion.version).where(DataVersion.id == DATA_VERSION_ID)
+        )).scalar_one_or_none()
+    return version or 0
+
+
+class DataVersionTracker:
+    """The newest data version this process has seen; it never moves backwards.
+
+    Every API process follows the version stored in the database, so
+    responses for the same data carry the same ETag whichever process
+    served them.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> int:
+        return self._version
+
+    def advance(self, version: int) -> int:
+        with self._lock:
+            if version > self._version:
+                self._version = version
+            return self._version
+
+    async def reload(self, session_factory: Callable[[], AsyncSession]) -> int:
+        """Catch up with the stored version."""
+        return self.advance(await read_data_version(session_factory))
+
+
+# Process-wide version shared by every request
+data_version = DataVersionTracker()
@@ -0,0 +1,76 @@
+"""In-process lookup of category and region names by id."""
+
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.models import Category, Region
+
+
+@dataclass(frozen=True)
+class Dimensions:
+    categories: dict[int, str]
+    regions: dict[int, str]
+
+    def category_ids(self, names: Sequence[str]) -> List[int]:
+        wanted = set(names)
+        return [category_id for category_id, name in self.categories.items() if name in wanted]
+
+    def region_ids(self, names: Sequence[str]) -> List[int]:
+        wanted = set(names)
+        return [region_id for region_id, name in self.regions.items() if name in wanted]
+
+    def knows(self, categories: Optional[Sequence[str]], regions: Optional[Sequence[str]]) -> bool:
+        """Whether every given category and region name is in the lookup."""
+        return (
+            set(categories or ()) <= set(self.categories.values())
+            and set(regions or ()) <= set(self.regions.values())
+        )
+
+    def category_names(self) -> List[str]:
+        return sorted(self.categories.values())
+
+    def region_names(self) -> List[str]:
+        return sorted(self.regions.values())
+
+
+async def load_dimensions(session: AsyncSession) -> Dimensions:
+    """Read the category and region tables."""
+    category_rows = (await session.execute(select(Category.id, Category.name))).all()
+    region_rows = (await session.execute(select(Region.id, Region.name))).all()
+    return Dimensions(
+        categories={category_id: name for category_id, name in category_rows},
+        regions={region_id: name for region_id, name in region_rows},
+    )
+
+
+class DimensionCache:
+    """Loads the dimension tables on first use and keeps them until invalidated."""
+
+    def __init__(self):
+        self._dimensions: Optional[Dimensions] = None
+        self._load_lock = asyncio.Lock()
+
+    async def get(self, session: AsyncSession) -> Dimensions:
+        dimensions = self._dimensions
+        if dimensions is not None:
+            return dimensions
+        return await self.reload(session, stale=None)
+
+    async def reload(self, session: AsyncSession, stale: Optional[Dimensions]) -> Dimensions:
+        """Load the dimensions again, unless another caller already replaced stale ones."""
+        async with self._load_lock:
+            if self._dimensions is not None and self._dimensions is not stale:
+                return self._dimensions
+            self._dimensions = await load_dimensions(session)
+            return self._dimensions
+
+    def invalidate(self) -> None:
+        self._dimensions = None
+
+
+# Process-wide dimension lookup shared by every request
+dimension_cache = DimensionCache()
@@ -0,0 +1,181 @@
+"""Bounded thread and process pools for CPU-bound work kept off the event loop."""
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from src.infrastructure.metrics import metrics_registry
+
+# Threads for NumPy work, which releases the GIL while it runs
+EXECUTOR_THREADS = int(os.getenv("EXECUTOR_THREADS", str(min(4, os.cpu_count() or 1))))
+# Processes for pure-Python work; 0 runs it on the threads instead
+EXECUTOR_PROCESSES = int(os.getenv("EXECUTOR_PROCESSES", "2"))
+# Tasks that may wait for a busy pool before further submissions are rejected
+EXECUTOR_MAX_QUEUE = int(os.getenv("EXECUTOR_MAX_QUEUE", "32"))
+
+executor_task_duration = metrics_registry.histogram(
+    "executor_task_duration_seconds",
+    "Time from submitting a task to an executor pool until its result was available.",
+    ("pool",),
+)
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised instead of queueing more work than a pool's limit allows."""
+
+
+@dataclass
+class ExecutorStats:
+    pool: str
+    workers: int
+    max_queue: int
+    in_flight: int
+    queue_depth: int
+    submitted: int
+    rejected: int
+
+
+class BoundedExecutor:
+    """A lazily started pool that rejects work once max_queue tasks are waiting for it.
+
+    Tasks count as in flight from submission until they finish, even if the
+    caller stopped waiting for them, so the limit reflects the pool's real
+    backlog.
+    """
+
+    def __init__(self, name: str, pool_factory: Callable[[], Executor], workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool_factory = pool_factory
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._rejected = 0
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> tuple[Executor, Future]:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(f"The {self.name} pool has {self.max_queue} tasks waiting already")
+            if self._pool is None:
+                self._pool = self._pool_factory()
+            self._in_flight += 1
+            self._submitted += 1
+            pool = self._pool
+
+        try:
+            future = pool.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return pool, future
+
+    def _release(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        started = time.perf_counter()
+        pool, future = self._submit(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; the next task starts a new one
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            executor_task_duration.observe((self.name,), time.perf_counter() - started)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._pool_factory()
+            pool = self._pool
+        # Process pools only spawn their workers once work is submitted; a no-op does it up front
+        pool.submit(int)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> ExecutorStats:
+        with self._lock:
+            return ExecutorStats(
+                pool=self.name,
+                workers=self.workers,
+                max_queue=self.max_queue,
+                in_flight=self._in_flight,
+                queue_depth=max(0, self._in_flight - self.workers),
+                submitted=self._submitted,
+                rejected=self._rejected,
+            )
+
+
+class AnalyticsExecutor:
+    """The thread pool and, when enabled, the process pool the use case offloads work to."""
+
+    def __init__(
+        self,
+        threads: int = EXECUTOR_THREADS,
+        processes: int = EXECUTOR_PROCESSES,
+        max_queue: int = EXECUTOR_MAX_QUEUE,
+    ):
+        self.threads = BoundedExecutor(
+            "thread",
+            lambda: ThreadPoolExecutor(max_workers=threads, thread_name_prefix="analytics"),
+            threads,
+            max_queue,
+        )
+        # Spawned rather than forked: forking copies the event loop and the pools' connections.
+        # Spawned workers re-import the __main__ module, so scripts serving the app need a
+        # __name__ == "__main__" guard, as run_backend.py and the benchmarks have
+        self.processes = BoundedExecutor(
+            "process",
+            lambda: ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")),
+            processes,
+            max_queue,
+        ) if processes > 0 else None
+
+    async def run_in_thread(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn on the thread pool, in a copy of the caller's context so its spans are recorded."""
+        return await self.threads.run(contextvars.copy_context().run, fn, *args)
+
+    async def run_in_process(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable module-level fn on the process pool, or the thread pool without one."""
+        if self.processes is None:
+            return await self.run_in_thread(fn, *args)
+        return await self.processes.run(fn, *args)
+
+    def start(self) -> None:
+        """Start the pools ahead of the first request, which would otherwise wait for the workers."""
+        self.threads.start()
+        if self.processes is not None:
+            self.processes.start()
+
+    def shutdown(self) -> None:
+        self.threads.shutdown()
+        if self.processes is not None:
+            self.processes.shutdown()
+
+    def stats(self) -> list[ExecutorStats]:
+        pools = [self.threads] if self.processes is None else [self.threads, self.processes]
+        return [pool.stats() for pool in pools]
+
+
+# Process-wide pools shared by every request
+analytics_executor = AnalyticsExecutor()
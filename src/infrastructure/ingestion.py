@@ -0,0 +1,376 @@
+"""Bulk ingestion of sales and customer files through PostgreSQL COPY."""
+
+import hashlib
+import io
+import itertools
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import pandas as pd
+
+from src.infrastructure.database import raw_connection
+
+INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "50000"))
+
+SALES_COLUMNS = ["date", "sales", "category", "region"]
+CUSTOMER_COLUMNS = ["customer_id", "age", "gender", "purchase_amount", "satisfaction"]
+
+_CREATE_SALES_STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS sales_staging (
+    date DATE NOT NULL,
+    sales DOUBLE PRECISION NOT NULL,
+    category TEXT NOT NULL,
+    region TEXT NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+_CREATE_CUSTOMERS_STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS customers_staging (
+    customer_id INTEGER NOT NULL,
+    age INTEGER NOT NULL,
+    gender TEXT NOT NULL,
+    purchase_amount DOUBLE PRECISION NOT NULL,
+    satisfaction INTEGER NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+_UPSERT_CATEGORIES = """
+INSERT INTO categories (name)
+SELECT DISTINCT category FROM sales_staging
+ON CONFLICT (name) DO NOTHING
+"""
+
+_UPSERT_REGIONS = """
+INSERT INTO regions (name)
+SELECT DISTINCT region FROM sales_staging
+ON CONFLICT (name) DO NOTHING
+"""
+
+_INSERT_SALES = """
+INSERT INTO sales (date, sales, category_id, region_id)
+SELECT s.date, s.sales, c.id, r.id
+FROM sales_staging s
+JOIN categories c ON c.name = s.category
+JOIN regions r ON r.name = s.region
+"""
+
+_UPSERT_CUSTOMERS = """
+INSERT INTO customers (customer_id, age, gender, purchase_amount, satisfaction)
+SELECT DISTINCT ON (customer_id) customer_id, age, gender, purchase_amount, satisfaction
+FROM customers_staging
+ORDER BY customer_id
+ON CONFLICT (customer_id) DO UPDATE SET
+    age = EXCLUDED.age,
+    gender = EXCLUDED.gender,
+    purchase_amount = EXCLUDED.purchase_amount,
+    satisfaction = EXCLUDED.satisfaction
+"""
+
+_SELECT_WATERMARK = """
+SELECT checksum, position, rows_loaded, max_date
+FROM ingestion_watermarks
+WHERE source = $1
+"""
+
+_UPSERT_WATERMARK = """
+INSERT INTO ingestion_watermarks (
+    source, checksum, position, rows_loaded, max_date,
+    pending_rows, pending_min_date, pending_max_date, updated_at
+)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, CURRENT_TIMESTAMP)
+ON CONFLICT (source) DO UPDATE SET
+    checksum = EXCLUDED.checksum,
+    position = EXCLUDED.position,
+    rows_loaded = EXCLUDED.rows_loaded,
+    max_date = EXCLUDED.max_date,
+    pending_rows = ingestion_watermarks.pending_rows + EXCLUDED.pending_rows,
+    pending_min_date = LEAST(ingestion_watermarks.pending_min_date, EXCLUDED.pending_min_date),
+    pending_max_date = GREATEST(ingestion_watermarks.pending_max_date, EXCLUDED.pending_max_date),
+    updated_at = EXCLUDED.updated_at
+"""
+
+_SELECT_PENDING = """
+SELECT source, pending_rows, pending_min_date, pending_max_date
+FROM ingestion_watermarks
+WHERE source = ANY($1::text[]) AND pending_rows > 0
+"""
+
+# Subtracts what was announced, so rows committed meanwhile by another run stay pending
+_CLEAR_PENDING = """
+UPDATE ingestion_watermarks SET
+    pending_rows = pending_rows - $2,
+    pending_min_date = CASE WHEN pending_rows = $2 THEN NULL ELSE pending_min_date END,
+    pending_max_date = CASE WHEN pending_rows = $2 THEN NULL ELSE pending_max_date END
+WHERE source = $1
+"""
+
+_LINE_BASED_SUFFIXES = (".csv", ".jsonl", ".ndjson")
+
+
+@dataclass
+class IngestionReport:
+    source: str
+    rows: int
+    seconds: float
+    date_range: Optional[tuple[date, date]] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class PendingChange:
+    """Rows of one source that were committed but not yet announced to the API."""
+
+    source: str
+    rows: int
+    date_range: Optional[tuple[date, date]] = None
+
+
+@dataclass
+class SourceChunk:
+    frame: pd.DataFrame
+    position: int
+    checksum: str
+
+
+def _file_digest(path: Path, length: Optional[int] = None):
+    """sha256 of the first length bytes of a file, or of the whole file."""
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            block = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest
+
+
+def _parse_lines(suffix: str, header: bytes, data: bytes, columns: list[str]) -> pd.DataFrame:
+    if suffix == ".csv":
+        return pd.read_csv(io.BytesIO(header + data), usecols=columns)
+    if not data.strip():
+        return pd.DataFrame(columns=columns)
+    return pd.read_json(io.BytesIO(data), lines=True)[columns]
+
+
+def read_chunks(
+    path: Path,
+    columns: list[str],
+    chunk_size: int = INGEST_CHUNK_ROWS,
+    position: int = 0,
+    digest=None,
+) -> Iterator[SourceChunk]:
+    """Read a CSV, JSON Lines or JSON array file as chunks of at most chunk_size rows.
+
+    CSV and JSON Lines are streamed from disk starting at byte offset position,
+    whose prefix hashes to digest; every chunk carries the offset after it and
+    the checksum of the file up to there. A trailing line without a newline is
+    still being written and is left for the next run. A JSON array has to be
+    parsed as a whole, so position is a record index and the checksum covers
+    the whole file.
+    """
+    suffix = path.suffix.lower()
+    if suffix in _LINE_BASED_SUFFIXES:
+        with open(path, 'rb') as f:
+            header = f.readline() if suffix == ".csv" else b""
+            if digest is None:
+                digest = hashlib.sha256(header)
+                position = len(header)
+            f.seek(position)
+            while True:
+                lines = list(itertools.islice(f, chunk_size))
+                partial = bool(lines) and not lines[-1].endswith(b"\n")
+                if partial:
+                    lines.pop()
+                if not lines:
+                    break
+                data = b"".join(lines)
+                position += len(data)
+                digest.update(data)
+                yield SourceChunk(
+                    frame=_parse_lines(suffix, header, data, columns),
+                    position=position,
+                    checksum=digest.hexdigest(),
+                )
+                if partial:
+                    break
+    elif suffix == ".json":
+        with open(path, 'rb') as f:
+            raw = f.read()
+        checksum = hashlib.sha256(raw).hexdigest()
+        records = json.loads(raw)
+        for start in range(position, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            yield SourceChunk(
+                frame=pd.DataFrame.from_records(chunk, columns=columns),
+                position=start + len(chunk),
+                checksum=checksum,
+            )
+    else:
+        raise ValueError(f"Unsupported file type: {path}")
+
+
+def _resume_point(path: Path, watermark) -> tuple[int, Optional[object]]:
+    """Where to continue reading a source, given its stored watermark.
+
+    Loading resumes at the stored position only if the part of the file it
+    covers is unchanged, i.e. the file was only appended to (or, for a JSON
+    array, not modified at all). Otherwise the file is read from the start.
+    """
+    if watermark is None or watermark["checksum"] is None:
+        return 0, None
+    line_based = path.suffix.lower() in _LINE_BASED_SUFFIXES
+    digest = _file_digest(path, watermark["position"] if line_based else None)
+    if digest.hexdigest() != watermark["checksum"]:
+        return 0, None
+    return watermark["position"], digest
+
+
+def _sales_records(chunk: pd.DataFrame) -> list[tuple]:
+    return list(zip(
+        pd.to_datetime(chunk["date"]).dt.date.tolist(),
+        chunk["sales"].astype(float).tolist(),
+        chunk["category"].astype(str).tolist(),
+        chunk["region"].astype(str).tolist(),
+    ))
+
+
+def _customer_records(chunk: pd.DataFrame) -> list[tuple]:
+    return list(zip(
+        chunk["customer_id"].astype(int).tolist(),
+        chunk["age"].astype(int).tolist(),
+        chunk["gender"].astype(str).tolist(),
+        chunk["purchase_amount"].astype(float).tolist(),
+        chunk["satisfaction"].astype(int).tolist(),
+    ))
+
+
+async def ingest_sales(
+    path: Path,
+    chunk_size: int = INGEST_CHUNK_ROWS,
+    on_progress: Optional[Callable[[IngestionReport], None]] = None,
+    incremental: bool = False,
+) -> IngestionReport:
+    """COPY sales rows into a staging table chunk by chunk and append them to sales.
+
+    Each chunk is committed in its own transaction together with the source's
+    watermark; categories and regions seen in the chunk are created in bulk
+    before the ids are resolved with a join. In incremental mode loading
+    resumes after the last committed chunk, and if the file was rewritten
+    rather than appended to only rows newer than the loaded ones are added.
+    """
+    started = time.perf_counter()
+    source = str(path)
+    rows = 0
+    date_range = None
+
+    async with raw_connection() as connection:
+        await connection.execute(_CREATE_SALES_STAGING)
+        watermark = await connection.fetchrow(_SELECT_WATERMARK, source) if incremental else None
+        position, digest = _resume_point(path, watermark)
+        newer_than = watermark["max_date"] if watermark is not None and digest is None else None
+        max_date = watermark["max_date"] if watermark is not None else None
+        rows_loaded = watermark["rows_loaded"] if watermark is not None else 0
+
+        for chunk in read_chunks(path, SALES_COLUMNS, chunk_size, position, digest):
+            records = _sales_records(chunk.frame)
+            if newer_than is not None:
+                records = [record for record in records if record[0] > newer_than]
+            low = high = None
+            if records:
+                dates = [record[0] for record in records]
+                low, high = min(dates), max(dates)
+                date_range = (min(date_range[0], low), max(date_range[1], high)) if date_range else (low, high)
+                max_date = max(max_date, high) if max_date else high
+
+            async with connection.transaction():
+                if records:
+                    await connection.copy_records_to_table(
+                        "sales_staging", records=records, columns=SALES_COLUMNS
+                    )
+                    await connection.execute(_UPSERT_CATEGORIES)
+                    await connection.execute(_UPSERT_REGIONS)
+                    await connection.execute(_INSERT_SALES)
+                await connection.execute(
+                    _UPSERT_WATERMARK, source, chunk.checksum, chunk.position, rows_loaded + len(records), max_date,
+                    len(records), low, high,
+                )
+            rows += len(records)
+            rows_loaded += len(records)
+            if on_progress:
+                on_progress(IngestionReport(source=source, rows=rows, seconds=time.perf_counter() - started))
+
+    return IngestionReport(source=source, rows=rows, seconds=time.perf_counter() - started, date_range=date_range)
+
+
+async def ingest_customers(
+    path: Path,
+    chunk_size: int = INGEST_CHUNK_ROWS,
+    on_progress: Optional[Callable[[IngestionReport], None]] = None,
+    incremental: bool = False,
+) -> IngestionReport:
+    """COPY customer rows into a staging table chunk by chunk and upsert them by customer_id.
+
+    In incremental mode loading resumes after the last committed chunk; a
+    rewritten file is upserted again from the start.
+    """
+    started = time.perf_counter()
+    source = str(path)
+    rows = 0
+
+    async with raw_connection() as connection:
+        await connection.execute(_CREATE_CUSTOMERS_STAGING)
+        watermark = await connection.fetchrow(_SELECT_WATERMARK, source) if incremental else None
+        position, digest = _resume_point(path, watermark)
+        rows_loaded = watermark["rows_loaded"] if watermark is not None else 0
+
+        for chunk in read_chunks(path, CUSTOMER_COLUMNS, chunk_size, position, digest):
+            records = _customer_records(chunk.frame)
+            async with connection.transaction():
+                if records:
+                    await connection.copy_records_to_table(
+                        "customers_staging", records=records, columns=CUSTOMER_COLUMNS
+                    )
+                    await connection.execute(_UPSERT_CUSTOMERS)
+                await connection.execute(
+                    _UPSERT_WATERMARK, source, chunk.checksum, chunk.position, rows_loaded + len(records), None,
+                    len(records), None, None,
+                )
+            rows += len(records)
+            rows_loaded += len(records)
+            if on_progress:
+                on_progress(IngestionReport(source=source, rows=rows, seconds=time.perf_counter() - started))
+
+    return IngestionReport(source=source, rows=rows, seconds=time.perf_counter() - started)
+
+
+async def pending_changes(paths: list[Path]) -> list[PendingChange]:
+    """Rows of the given sources committed since their last announcement, including by crashed runs."""
+    async with raw_connection() as connection:
+        rows = await connection.fetch(_SELECT_PENDING, [str(path) for path in paths])
+    return [
+        PendingChange(
+            source=row["source"],
+            rows=row["pending_rows"],
+            date_range=(row["pending_min_date"], row["pending_max_date"]) if row["pending_min_date"] else None,
+        )
+        for row in rows
+    ]
+
+
+async def clear_pending_changes(changes: list[PendingChange]) -> None:
+    """Mark changes as announced once the API has been notified of them."""
+    async with raw_connection() as connection:
+        async with connection.transaction():
+            for change in changes:
+                await connection.execute(_CLEAR_PENDING, change.source, change.rows)
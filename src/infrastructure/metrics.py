@@ -0,0 +1,121 @@
+"""Prometheus-style metrics rendered in the text exposition format."""
+
+import bisect
+import math
+import threading
+from typing import Callable, Iterable, List, Sequence
+
+# Upper bounds in seconds, from sub-millisecond lookups to slow full scans
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per combination of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts, then the overflow count, the sum and the total count
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+
+        for labels, values in series:
+            label_map = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values):
+                cumulative += count
+                bucket_labels = format_labels({**label_map, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(label_map)} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{format_labels(label_map)} {values[-1]}")
+        return lines
+
+
+def render_samples(
+    name: str, documentation: str, metric_type: str, samples: Iterable[tuple[dict, float]]
+) -> List[str]:
+    """A gauge or counter family whose values are read at scrape time."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{name}{format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+    return lines
+
+
+class MetricsRegistry:
+    """Histograms recorded in-process plus collectors that report other values at scrape time."""
+
+    def __init__(self):
+        self._histograms: List[Histogram] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str]) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames)
+        self._histograms.append(histogram)
+        return histogram
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry scraped by GET /metrics
+metrics_registry = MetricsRegistry()
+
+request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request until its response body was sent.",
+    ("method", "route", "status"),
+)
+
+stage_duration = metrics_registry.histogram(
+    "app_stage_duration_seconds",
+    "Time spent in each instrumented stage; stages nest, so parents include their children.",
+    ("stage",),
+)
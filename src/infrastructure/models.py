@@ -5,6 +5,7 @@ from typing import Optional
 
 from sqlalchemy import (
     DECIMAL,
+    BigInteger,
     CheckConstraint,
     Column,
     Date,
@@ -52,7 +53,7 @@ class Sales(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     date = Column(Date, nullable=False, index=True)
-    sales = Column(DECIMAL(12, 2), nullable=False)
+    sales = Column(DECIMAL(12, 2), nullable=False, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     region_id = Column(Integer, ForeignKey("regions.id"), nullable=False)
     created_at = Column(TIMESTAMP, default=func.current_timestamp())
@@ -67,6 +68,26 @@ class Sales(Base):
     region = relationship("Region", back_populates="sales")
 
 
+class SalesDailyRollup(Base):
+    """Pre-aggregated daily sales per category and region."""
+    
+    __tablename__ = "sales_daily_rollup"
+    
+    date = Column(Date, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    region_id = Column(Integer, ForeignKey("regions.id"), primary_key=True)
+    total = Column(DECIMAL(16, 2), nullable=False)
+    count = Column(Integer, nullable=False)
+
+
+class SalesRollupDirtyDate(Base):
+    """Dates whose rollup rows must be recomputed from sales."""
+    
+    __tablename__ = "sales_rollup_dirty_dates"
+    
+    date = Column(Date, primary_key=True)
+
+
 class Customer(Base):
     """Customer model for customer data."""
     
@@ -86,4 +107,30 @@ class Customer(Base):
         CheckConstraint("gender IN ('男性', '女性')", name="check_gender_values"),
         CheckConstraint("purchase_amount >= 0", name="check_purchase_amount_positive"),
         CheckConstraint("satisfaction >= 1 AND satisfaction <= 5", name="check_satisfaction_range"),
-    )
\ No newline at end of file
+    )
+
+
+class IngestionWatermark(Base):
+    """Progress of incremental ingestion for one source file."""
+    
+    __tablename__ = "ingestion_watermarks"
+    
+    source = Column(String(500), primary_key=True)
+    checksum = Column(String(64))
+    position = Column(BigInteger, nullable=False, default=0)
+    rows_loaded = Column(BigInteger, nullable=False, default=0)
+    max_date = Column(Date)
+    pending_rows = Column(BigInteger, nullable=False, default=0)
+    pending_min_date = Column(Date)
+    pending_max_date = Column(Date)
+    updated_at = Column(TIMESTAMP, default=func.current_timestamp())
+
+
+class DataVersion(Base):
+    """Single-row counter bumped by every ingest that changes data."""
+    
+    __tablename__ = "data_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, default=func.current_timestamp())
@@ -0,0 +1,71 @@
+"""Connection pool instrumented with checkout wait and saturation statistics."""
+
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+@dataclass
+class PoolStats:
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    saturation: float
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection.
+
+    The wait includes opening a new connection when the pool grows into its
+    overflow, which is the latency a request actually sees.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self._checkouts += 1
+            self._wait_seconds_total += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        return connection
+
+    def stats(self) -> PoolStats:
+        checked_out = self.checkedout()
+        capacity = self.size() + max(self._max_overflow, 0)
+        with self._stats_lock:
+            return PoolStats(
+                pool_size=self.size(),
+                max_overflow=self._max_overflow,
+                checked_out=checked_out,
+                checked_in=self.checkedin(),
+                overflow=max(self.overflow(), 0),
+                saturation=checked_out / capacity if capacity else 0.0,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                wait_seconds_total=self._wait_seconds_total,
+                wait_seconds_max=self._wait_seconds_max,
+            )
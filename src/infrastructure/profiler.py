@@ -0,0 +1,68 @@
+"""Sampling profiler that writes collapsed stacks for flamegraph tools."""
+
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+PROFILE_OUTPUT_DIR = Path(os.getenv("PROFILE_OUTPUT_DIR", "profiles"))
+
+
+# Frames from the project are shown relative to it, library frames with their full path
+_WORKING_DIRECTORY = os.getcwd() + os.sep
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename.removeprefix(_WORKING_DIRECTORY)
+    # Semicolons separate frames in the collapsed format
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", "_")
+
+
+class SamplingProfiler:
+    """Samples one thread's call stack at a fixed interval from a background thread.
+
+    Profiling the event loop thread captures whatever it runs during the
+    sampling window, including other requests served concurrently, and shows
+    time spent waiting for I/O as samples inside the loop's selector.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval_ms / 1000
+        self.samples: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._sampler = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """One "frame;frame;frame count" line per distinct stack, as flamegraph.pl and speedscope read."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed(), encoding="utf-8")
+        return path
@@ -1,77 +1,885 @@
+import base64
+import binascii
+import json
+import math
+import os
 from abc import ABC, abstractmethod
-from typing import List
+from array import array
+from datetime import date
+from typing import Any, AsyncIterator, Callable, List, Optional, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Date,
+    cast,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    tablesample,
+    text,
+    tuple_,
+    union_all,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from src.domain.models import CustomerData, SalesData
-from src.infrastructure.models import Category, Customer, Region, Sales
+from src.domain.models import (
+    EPOCH_ORDINAL,
+    GRANULARITIES,
+    SATISFACTION_RANGES,
+    CustomerAggregates,
+    CustomerBatch,
+    CustomerData,
+    FilterCriteria,
+    Page,
+    SalesAggregates,
+    SalesBatch,
+    SalesData,
+    SalesErrorBounds,
+)
+from src.infrastructure.dimensions import DimensionCache, Dimensions
+from src.infrastructure.models import (
+    Customer,
+    Sales,
+    SalesDailyRollup,
+    SalesRollupDirtyDate,
+)
+from src.infrastructure.tracing import traced
+
+T = TypeVar("T")
+
+# Percentage of sales table pages read by approximate queries
+APPROXIMATE_SAMPLE_PERCENT = float(os.getenv("APPROXIMATE_SAMPLE_PERCENT", "1"))
+
+# z-score of the confidence level reported for approximate results (95%)
+CONFIDENCE_Z = 1.96
 
 
 class SalesRepository(ABC):
     @abstractmethod
-    async def get_sales_data(self) -> List[SalesData]:
+    async def get_sales_data(self, filters: Optional[FilterCriteria] = None) -> SalesBatch:
+        pass
+
+    @abstractmethod
+    def stream_sales_data(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> AsyncIterator[SalesData]:
+        pass
+
+    @abstractmethod
+    def stream_sales_batches(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> AsyncIterator[SalesBatch]:
+        pass
+
+    @abstractmethod
+    async def get_sales_page(
+        self,
+        filters: Optional[FilterCriteria] = None,
+        page_size: int = 100,
+        cursor: Optional[str] = None,
+        sort_by: str = "date",
+        descending: bool = True
+    ) -> Page[SalesData]:
+        pass
+
+    @abstractmethod
+    async def count_sales(self, filters: Optional[FilterCriteria] = None) -> int:
+        pass
+
+    @abstractmethod
+    async def get_sales_aggregates(
+        self, filters: Optional[FilterCriteria] = None, granularity: str = "day"
+    ) -> SalesAggregates:
+        pass
+
+    @abstractmethod
+    async def get_categories(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    async def get_regions(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    async def get_sales_range(self) -> tuple[float, float]:
         pass
 
 
 class CustomerRepository(ABC):
     @abstractmethod
-    async def get_customer_data(self) -> List[CustomerData]:
+    async def get_customer_data(self, filters: Optional[FilterCriteria] = None) -> CustomerBatch:
+        pass
+
+    @abstractmethod
+    def stream_customer_data(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerData]:
+        pass
+
+    @abstractmethod
+    def stream_customer_batches(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerBatch]:
+        pass
+
+    @abstractmethod
+    async def get_customer_page(
+        self,
+        filters: Optional[FilterCriteria] = None,
+        page_size: int = 100,
+        cursor: Optional[str] = None,
+        sort_by: str = "customer_id",
+        descending: bool = False
+    ) -> Page[CustomerData]:
+        pass
+
+    @abstractmethod
+    async def count_customers(self, filters: Optional[FilterCriteria] = None) -> int:
+        pass
+
+    @abstractmethod
+    async def get_customer_aggregates(self, filters: Optional[FilterCriteria] = None) -> CustomerAggregates:
+        pass
+
+    @abstractmethod
+    async def get_age_range(self) -> tuple[int, int]:
+        pass
+
+    @abstractmethod
+    async def get_genders(self) -> List[str]:
         pass
 
 
+SALES_SORT_COLUMNS = {
+    "date": Sales.date,
+    "sales": Sales.sales,
+}
+
+CUSTOMER_SORT_COLUMNS = {
+    "customer_id": Customer.customer_id,
+    "age": Customer.age,
+    "purchase_amount": Customer.purchase_amount,
+    "satisfaction": Customer.satisfaction,
+}
+
+
+def _as_date(value) -> date:
+    return value.date() if hasattr(value, 'date') else value
+
+
+def _encode_cursor(sort_by: str, descending: bool, sort_value: Any, row_id: int) -> str:
+    payload = json.dumps([sort_by, descending, str(sort_value), row_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, sort_by: str, descending: bool, sort_column) -> tuple[Any, int]:
+    """Decode a keyset cursor into the (sort value, id) of the last row of the previous page."""
+    try:
+        cursor_sort_by, cursor_descending, sort_value, row_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    
+    if cursor_sort_by != sort_by or cursor_descending != descending:
+        raise ValueError("Cursor does not match the requested sort order")
+    # int() would truncate 7.5 and accept true
+    if not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    
+    python_type = sort_column.type.python_type
+    try:
+        if python_type is date:
+            return date.fromisoformat(sort_value), row_id
+        return python_type(sort_value), row_id
+    except (ValueError, TypeError, ArithmeticError) as e:
+        # Decimal raises InvalidOperation, an ArithmeticError, for malformed numbers
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _keyset_clause(sort_column, id_column, cursor_key: tuple[Any, int], descending: bool):
+    key = tuple_(sort_column, id_column)
+    return key < tuple_(*cursor_key) if descending else key > tuple_(*cursor_key)
+
+
+def _keyset_order(sort_column, id_column, descending: bool) -> tuple:
+    if descending:
+        return sort_column.desc(), id_column.desc()
+    return sort_column.asc(), id_column.asc()
+
+
+async def _estimated_row_count(db_session: AsyncSession, table_name: str) -> Optional[int]:
+    """Planner row estimate for a table, or None if it has never been analyzed."""
+    result = await db_session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table_name AS regclass)"),
+        {"table_name": table_name},
+    )
+    estimate = result.scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+def _sales_filter_clauses(
+    filters: Optional[FilterCriteria],
+    dimensions: Dimensions,
+    date_column=Sales.date,
+    category_column=Sales.category_id,
+    region_column=Sales.region_id
+) -> list:
+    """Build WHERE clauses on date, category and region for the given filters.
+
+    Category and region names are resolved to ids up front so that no join
+    with the dimension tables is needed.
+    """
+    if not filters:
+        return []
+    
+    clauses = []
+    if filters.date_range:
+        clauses.append(
+            date_column.between(_as_date(filters.date_range[0]), _as_date(filters.date_range[1]))
+        )
+    if filters.categories:
+        clauses.append(category_column.in_(dimensions.category_ids(filters.categories)))
+    if filters.regions:
+        clauses.append(region_column.in_(dimensions.region_ids(filters.regions)))
+    return clauses
+
+
+def _sales_range_clauses(filters: Optional[FilterCriteria], sales_column=Sales.sales) -> list:
+    """Build WHERE clauses on individual sale amounts for the given filters."""
+    if not filters or not filters.sales_range:
+        return []
+    return [sales_column.between(filters.sales_range[0], filters.sales_range[1])]
+
+
+def _date_bucket(date_column, granularity: str):
+    """Truncate a date column to the start of its day, week, month or quarter."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    if granularity == "day":
+        return date_column
+    # Inlined rather than bound so that grouping() matches the GROUP BY expression
+    return cast(func.date_trunc(literal_column(f"'{granularity}'"), date_column), Date)
+
+
+def _sampled_total_error(sum_of_squares: float, fraction: float) -> float:
+    """95% bound of a sum scaled up from a sample of table pages.
+
+    SYSTEM sampling keeps each page with probability f, so the pages are the
+    sampled units. For the estimator sum(y) / f, with y the total of a page,
+    the variance is (1 - f) / f * sum(y^2) over all pages, and sum(y^2) / f
+    over the sampled pages estimates that sum.
+    """
+    return CONFIDENCE_Z * math.sqrt(max(sum_of_squares, 0.0) * (1 - fraction)) / fraction
+
+
+def _sampled_mean_error(
+    total: float, count: int, total_squares: float, count_squares: float, cross: float, fraction: float
+) -> float:
+    """95% bound of the mean total / count estimated from a sample of table pages.
+
+    Linearizing the ratio, each page contributes its residual y - m * n, with
+    y and n the page's total and row count; the sums of y^2, n^2 and y * n
+    over the sampled pages give the sum of squared residuals.
+    """
+    if count < 2:
+        return 0.0
+    mean = total / count
+    residuals = max(total_squares - 2 * mean * cross + mean * mean * count_squares, 0.0)
+    return CONFIDENCE_Z * math.sqrt(residuals * (1 - fraction)) / count
+
+
+def _daily_sales(filters: Optional[FilterCriteria]):
+    """Daily totals per category and region as (date, category_id, region_id, total, count).
+
+    Filters on individual sale amounts are answered from the sales table. All
+    other filters read sales_daily_rollup, recomputing only the dates whose
+    rollup rows have not been refreshed yet from sales.
+    """
+    raw = (
+        select(
+            Sales.date,
+            Sales.category_id,
+            Sales.region_id,
+            func.sum(Sales.sales).label("total"),
+            func.count().label("count"),
+        )
+        .group_by(Sales.date, Sales.category_id, Sales.region_id)
+    )
+    
+    if filters and filters.sales_range:
+        return raw.where(*_sales_range_clauses(filters)).subquery()
+    
+    dirty_dates = select(SalesRollupDirtyDate.date)
+    return union_all(
+        select(
+            SalesDailyRollup.date,
+            SalesDailyRollup.category_id,
+            SalesDailyRollup.region_id,
+            SalesDailyRollup.total,
+            SalesDailyRollup.count,
+        ).where(SalesDailyRollup.date.not_in(dirty_dates)),
+        raw.where(Sales.date.in_(dirty_dates)),
+    ).subquery()
+
+
+def _sales_batch(rows, dimensions: Dimensions) -> SalesBatch:
+    """Columns of (date, sales, category_id, region_id) rows, coded against the dimension names."""
+    category_codes = {category_id: code for code, category_id in enumerate(dimensions.categories)}
+    region_codes = {region_id: code for code, region_id in enumerate(dimensions.regions)}
+    return SalesBatch(
+        days=array("i", [row[0].toordinal() - EPOCH_ORDINAL for row in rows]),
+        sales=array("d", [float(row[1]) for row in rows]),
+        category_codes=array("i", [category_codes[row[2]] for row in rows]),
+        categories=tuple(dimensions.categories.values()),
+        region_codes=array("i", [region_codes[row[3]] for row in rows]),
+        regions=tuple(dimensions.regions.values()),
+    )
+
+
+def _customer_batch(rows) -> CustomerBatch:
+    """Columns of (customer_id, age, gender, purchase_amount, satisfaction) rows."""
+    return CustomerBatch.from_columns(
+        customer_ids=[row[0] for row in rows],
+        ages=[row[1] for row in rows],
+        genders=[row[2] for row in rows],
+        purchase_amounts=[float(row[3]) for row in rows],
+        satisfaction=[row[4] for row in rows],
+    )
+
+
+def _customer_filter_clauses(filters: Optional[FilterCriteria]) -> list:
+    """Build WHERE clauses on the customers table for the given filters."""
+    if not filters:
+        return []
+    
+    clauses = []
+    if filters.age_range:
+        clauses.append(Customer.age.between(filters.age_range[0], filters.age_range[1]))
+    if filters.genders:
+        clauses.append(Customer.gender.in_(filters.genders))
+    satisfaction_range = SATISFACTION_RANGES.get(filters.satisfaction_filter)
+    if satisfaction_range:
+        clauses.append(Customer.satisfaction.between(*satisfaction_range))
+    return clauses
+
+
+@traced("sales_repository")
 class PostgreSQLSalesRepository(SalesRepository):
     """PostgreSQL implementation of SalesRepository."""
     
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, dimension_cache: Optional[DimensionCache] = None):
         self.db_session = db_session
+        self.dimension_cache = dimension_cache or DimensionCache()
+    
+    async def _with_dimensions(self, build: Callable[[Dimensions], T]) -> T:
+        """Map dimension ids to names, reloading the lookup once if it misses a new id."""
+        dimensions = await self.dimension_cache.get(self.db_session)
+        try:
+            return build(dimensions)
+        except KeyError:
+            dimensions = await self.dimension_cache.reload(self.db_session, stale=dimensions)
+            return build(dimensions)
+    
+    async def _filter_dimensions(self, filters: Optional[FilterCriteria]) -> Dimensions:
+        """The lookup to resolve filter names with, reloaded once if it misses a requested name.
+
+        A name created by an ingest this process has not been notified of yet
+        would otherwise match no ids and silently select nothing.
+        """
+        dimensions = await self.dimension_cache.get(self.db_session)
+        if filters and not dimensions.knows(filters.categories, filters.regions):
+            dimensions = await self.dimension_cache.reload(self.db_session, stale=dimensions)
+        return dimensions
     
-    async def get_sales_data(self) -> List[SalesData]:
-        """Fetch sales data from PostgreSQL database."""
+    async def get_sales_data(self, filters: Optional[FilterCriteria] = None) -> SalesBatch:
+        """Fetch sales data matching the filters from PostgreSQL database."""
+        dimensions = await self._filter_dimensions(filters)
         stmt = (
-            select(Sales)
-            .options(
-                selectinload(Sales.category),
-                selectinload(Sales.region)
-            )
+            select(Sales.date, Sales.sales, Sales.category_id, Sales.region_id)
+            .where(*_sales_filter_clauses(filters, dimensions), *_sales_range_clauses(filters))
             .order_by(Sales.date.desc())
         )
         
-        result = await self.db_session.execute(stmt)
-        sales_records = result.scalars().all()
+        rows = (await self.db_session.execute(stmt)).all()
+        
+        return await self._with_dimensions(lambda dimensions: _sales_batch(rows, dimensions))
+    
+    async def stream_sales_data(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> AsyncIterator[SalesData]:
+        """Stream sales data matching the filters through a server-side cursor."""
+        async for batch in self.stream_sales_batches(filters, batch_size):
+            for sale in batch:
+                yield sale
+    
+    async def stream_sales_batches(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> AsyncIterator[SalesBatch]:
+        """Stream sales data matching the filters in batches of up to batch_size rows."""
+        dimensions = await self._filter_dimensions(filters)
+        stmt = (
+            select(Sales.date, Sales.sales, Sales.category_id, Sales.region_id)
+            .where(*_sales_filter_clauses(filters, dimensions), *_sales_range_clauses(filters))
+            .order_by(Sales.date.desc())
+            .execution_options(yield_per=batch_size)
+        )
         
-        return [
+        result = await self.db_session.stream(stmt)
+        async for partition in result.partitions():
+            yield await self._with_dimensions(lambda dimensions: _sales_batch(partition, dimensions))
+    
+    async def get_sales_page(
+        self,
+        filters: Optional[FilterCriteria] = None,
+        page_size: int = 100,
+        cursor: Optional[str] = None,
+        sort_by: str = "date",
+        descending: bool = True
+    ) -> Page[SalesData]:
+        """Fetch one page of sales ordered by (sort column, id) using keyset pagination."""
+        if sort_by not in SALES_SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+        sort_column = SALES_SORT_COLUMNS[sort_by]
+        
+        dimensions = await self._filter_dimensions(filters)
+        stmt = (
+            select(Sales.id, sort_column.label("sort_key"), Sales.date, Sales.sales, Sales.category_id, Sales.region_id)
+            .where(*_sales_filter_clauses(filters, dimensions), *_sales_range_clauses(filters))
+        )
+        if cursor:
+            cursor_key = _decode_cursor(cursor, sort_by, descending, sort_column)
+            stmt = stmt.where(_keyset_clause(sort_column, Sales.id, cursor_key, descending))
+        stmt = stmt.order_by(*_keyset_order(sort_column, Sales.id, descending)).limit(page_size + 1)
+        
+        rows = (await self.db_session.execute(stmt)).all()
+        
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = _encode_cursor(sort_by, descending, rows[-1].sort_key, rows[-1].id)
+        
+        items = await self._with_dimensions(lambda dimensions: [
             SalesData(
-                date=record.date,
-                sales=float(record.sales),
-                category=record.category.name,
-                region=record.region.name
+                date=sale_date,
+                sales=float(amount),
+                category=dimensions.categories[category_id],
+                region=dimensions.regions[region_id]
+            )
+            for _, _, sale_date, amount, category_id, region_id in rows
+        ])
+        return Page(items=items, next_cursor=next_cursor)
+    
+    async def count_sales(self, filters: Optional[FilterCriteria] = None) -> int:
+        """Count sales matching the filters, reading the daily rollup where possible."""
+        dimensions = await self._filter_dimensions(filters)
+        daily = _daily_sales(filters)
+        stmt = (
+            select(func.coalesce(func.sum(daily.c.count), 0))
+            .select_from(daily)
+            .where(*_sales_filter_clauses(
+                filters, dimensions, daily.c.date, daily.c.category_id, daily.c.region_id
+            ))
+        )
+        
+        result = await self.db_session.execute(stmt)
+        return int(result.scalar())
+    
+    async def get_sales_aggregates(
+        self, filters: Optional[FilterCriteria] = None, granularity: str = "day"
+    ) -> SalesAggregates:
+        """Aggregate sales by date bucket, category and region in a single GROUPING SETS query.
+
+        Approximate requests are only sampled when they filter on individual
+        sale amounts, which the daily rollup cannot answer; otherwise the
+        rollup gives exact results faster than a sample of the sales table.
+        """
+        if filters and filters.approximate and filters.sales_range:
+            return await self._get_sampled_sales_aggregates(filters, granularity)
+        
+        dimensions = await self._filter_dimensions(filters)
+        daily = _daily_sales(filters)
+        bucket = _date_bucket(daily.c.date, granularity)
+        
+        # grouping() sets one bit per column that is *not* part of the row's grouping set
+        stmt = (
+            select(
+                func.grouping(bucket, daily.c.category_id, daily.c.region_id),
+                bucket,
+                daily.c.category_id,
+                daily.c.region_id,
+                func.sum(daily.c.total),
+                func.sum(daily.c.count),
+            )
+            .select_from(daily)
+            .where(*_sales_filter_clauses(
+                filters, dimensions, daily.c.date, daily.c.category_id, daily.c.region_id
+            ))
+            .group_by(
+                func.grouping_sets(
+                    tuple_(bucket),
+                    tuple_(daily.c.category_id),
+                    tuple_(daily.c.region_id),
+                    tuple_(),
+                )
+            )
+        )
+        
+        rows = (await self.db_session.execute(stmt)).all()
+        
+        def build(dimensions: Dimensions) -> SalesAggregates:
+            total_sales, count = 0.0, 0
+            by_date, by_category, by_region = [], [], []
+            for grouping, sale_date, category_id, region_id, total, row_count in rows:
+                total = float(total) if total is not None else 0.0
+                if grouping == 0b011:
+                    by_date.append((sale_date, total))
+                elif grouping == 0b101:
+                    by_category.append((dimensions.categories[category_id], total))
+                elif grouping == 0b110:
+                    by_region.append((dimensions.regions[region_id], total))
+                else:
+                    total_sales, count = total, int(row_count or 0)
+            
+            return SalesAggregates(
+                total_sales=total_sales,
+                count=count,
+                by_date=sorted(by_date),
+                by_category=sorted(by_category),
+                by_region=sorted(by_region),
+            )
+        
+        return await self._with_dimensions(build)
+    
+    async def _get_sampled_sales_aggregates(
+        self, filters: FilterCriteria, granularity: str = "day"
+    ) -> SalesAggregates:
+        """Estimate sales aggregates from a TABLESAMPLE SYSTEM sample of the sales table.
+
+        SYSTEM sampling reads only the chosen pages, unlike BERNOULLI, which
+        reads every page to pick rows. Sums and counts are scaled up by the
+        sampling fraction and carry 95% error bounds computed from per-page
+        totals, since rows on the same page are sampled together.
+        """
+        fraction = APPROXIMATE_SAMPLE_PERCENT / 100
+        dimensions = await self._filter_dimensions(filters)
+        sampled = tablesample(Sales, func.system(APPROXIMATE_SAMPLE_PERCENT), name="sampled")
+        amount = sampled.c.sales
+        bucket = _date_bucket(sampled.c.date, granularity)
+        # The block number part of the row's ctid
+        page = literal_column("(sampled.ctid::text::point)[0]")
+        
+        # Totals per page within each grouping set, then summed and squared per group
+        pages = (
+            select(
+                func.grouping(bucket, sampled.c.category_id, sampled.c.region_id).label("grouping"),
+                bucket.label("bucket"),
+                sampled.c.category_id,
+                sampled.c.region_id,
+                func.sum(amount).label("total"),
+                func.count().label("count"),
+            )
+            .where(
+                *_sales_filter_clauses(
+                    filters, dimensions, sampled.c.date, sampled.c.category_id, sampled.c.region_id
+                ),
+                *_sales_range_clauses(filters, amount),
+            )
+            .group_by(
+                func.grouping_sets(
+                    tuple_(page, bucket),
+                    tuple_(page, sampled.c.category_id),
+                    tuple_(page, sampled.c.region_id),
+                    tuple_(page),
+                )
+            )
+            .subquery("pages")
+        )
+        stmt = (
+            select(
+                pages.c.grouping,
+                pages.c.bucket,
+                pages.c.category_id,
+                pages.c.region_id,
+                func.sum(pages.c.total),
+                func.sum(pages.c.count),
+                func.sum(pages.c.total * pages.c.total),
+                func.sum(pages.c.count * pages.c.count),
+                func.sum(pages.c.total * pages.c.count),
+            )
+            .group_by(pages.c.grouping, pages.c.bucket, pages.c.category_id, pages.c.region_id)
+        )
+        
+        rows = (await self.db_session.execute(stmt)).all()
+        
+        def build(dimensions: Dimensions) -> SalesAggregates:
+            total_sales, count = 0.0, 0
+            total_sales_error, avg_sales_error = 0.0, 0.0
+            by_date, by_category, by_region = [], [], []
+            date_errors, category_errors, region_errors = {}, {}, {}
+            for grouping, sale_date, category_id, region_id, total, row_count, squares, count_squares, cross in rows:
+                total = float(total) if total is not None else 0.0
+                squares = float(squares) if squares is not None else 0.0
+                estimate = total / fraction
+                error = _sampled_total_error(squares, fraction)
+                if grouping == 0b011:
+                    by_date.append((sale_date, estimate))
+                    date_errors[sale_date] = error
+                elif grouping == 0b101:
+                    category = dimensions.categories[category_id]
+                    by_category.append((category, estimate))
+                    category_errors[category] = error
+                elif grouping == 0b110:
+                    region = dimensions.regions[region_id]
+                    by_region.append((region, estimate))
+                    region_errors[region] = error
+                else:
+                    total_sales, count = estimate, round(int(row_count or 0) / fraction)
+                    total_sales_error = error
+                    avg_sales_error = _sampled_mean_error(
+                        total, int(row_count or 0), squares, float(count_squares or 0), float(cross or 0), fraction
+                    )
+            
+            return SalesAggregates(
+                total_sales=total_sales,
+                count=count,
+                by_date=sorted(by_date),
+                by_category=sorted(by_category),
+                by_region=sorted(by_region),
+                error_bounds=SalesErrorBounds(
+                    sample_fraction=fraction,
+                    total_sales=total_sales_error,
+                    avg_sales=avg_sales_error,
+                    by_date=date_errors,
+                    by_category=category_errors,
+                    by_region=region_errors,
+                ),
             )
-            for record in sales_records
-        ]
+        
+        return await self._with_dimensions(build)
+    
+    async def get_categories(self) -> List[str]:
+        """List category names from the dimension lookup."""
+        dimensions = await self.dimension_cache.get(self.db_session)
+        return dimensions.category_names()
+    
+    async def get_regions(self) -> List[str]:
+        """List region names from the dimension lookup."""
+        dimensions = await self.dimension_cache.get(self.db_session)
+        return dimensions.region_names()
+    
+    async def get_sales_range(self) -> tuple[float, float]:
+        """Smallest and largest sale, each read from one end of idx_sales_sales."""
+        result = await self.db_session.execute(select(func.min(Sales.sales), func.max(Sales.sales)))
+        low, high = result.one()
+        return (float(low), float(high)) if low is not None else (0.0, 0.0)
 
 
+@traced("customer_repository")
 class PostgreSQLCustomerRepository(CustomerRepository):
     """PostgreSQL implementation of CustomerRepository."""
     
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
     
-    async def get_customer_data(self) -> List[CustomerData]:
-        """Fetch customer data from PostgreSQL database."""
-        stmt = select(Customer).order_by(Customer.customer_id)
+    async def get_customer_data(self, filters: Optional[FilterCriteria] = None) -> CustomerBatch:
+        """Fetch customer data matching the filters from PostgreSQL database."""
+        stmt = (
+            select(
+                Customer.customer_id,
+                Customer.age,
+                Customer.gender,
+                Customer.purchase_amount,
+                Customer.satisfaction,
+            )
+            .where(*_customer_filter_clauses(filters))
+            .order_by(Customer.customer_id)
+        )
+        
+        rows = (await self.db_session.execute(stmt)).all()
+        
+        return _customer_batch(rows)
+    
+    async def stream_customer_data(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerData]:
+        """Stream customer data matching the filters through a server-side cursor."""
+        async for batch in self.stream_customer_batches(filters, batch_size):
+            for customer in batch:
+                yield customer
+    
+    async def stream_customer_batches(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerBatch]:
+        """Stream customer data matching the filters in batches of up to batch_size rows."""
+        stmt = (
+            select(
+                Customer.customer_id,
+                Customer.age,
+                Customer.gender,
+                Customer.purchase_amount,
+                Customer.satisfaction,
+            )
+            .where(*_customer_filter_clauses(filters))
+            .order_by(Customer.customer_id)
+            .execution_options(yield_per=batch_size)
+        )
+        
+        result = await self.db_session.stream(stmt)
+        async for partition in result.partitions():
+            yield _customer_batch(partition)
+    
+    async def get_customer_page(
+        self,
+        filters: Optional[FilterCriteria] = None,
+        page_size: int = 100,
+        cursor: Optional[str] = None,
+        sort_by: str = "customer_id",
+        descending: bool = False
+    ) -> Page[CustomerData]:
+        """Fetch one page of customers ordered by (sort column, customer_id) using keyset pagination."""
+        if sort_by not in CUSTOMER_SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+        sort_column = CUSTOMER_SORT_COLUMNS[sort_by]
+        
+        stmt = select(
+            sort_column.label("sort_key"),
+            Customer.customer_id,
+            Customer.age,
+            Customer.gender,
+            Customer.purchase_amount,
+            Customer.satisfaction,
+        ).where(*_customer_filter_clauses(filters))
+        if cursor:
+            cursor_key = _decode_cursor(cursor, sort_by, descending, sort_column)
+            stmt = stmt.where(_keyset_clause(sort_column, Customer.customer_id, cursor_key, descending))
+        stmt = stmt.order_by(*_keyset_order(sort_column, Customer.customer_id, descending)).limit(page_size + 1)
+        
+        rows = (await self.db_session.execute(stmt)).all()
+        
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = _encode_cursor(sort_by, descending, rows[-1].sort_key, rows[-1].customer_id)
+        
+        return Page(
+            items=[
+                CustomerData(
+                    customer_id=customer_id,
+                    age=age,
+                    gender=gender,
+                    purchase_amount=float(purchase_amount),
+                    satisfaction=satisfaction
+                )
+                for _, customer_id, age, gender, purchase_amount, satisfaction in rows
+            ],
+            next_cursor=next_cursor,
+        )
+    
+    async def count_customers(self, filters: Optional[FilterCriteria] = None) -> int:
+        """Count customers matching the filters, using the planner estimate when unfiltered."""
+        clauses = _customer_filter_clauses(filters)
+        if not clauses:
+            estimate = await _estimated_row_count(self.db_session, Customer.__tablename__)
+            if estimate is not None:
+                return estimate
+        
+        result = await self.db_session.execute(
+            select(func.count()).select_from(Customer).where(*clauses)
+        )
+        return int(result.scalar())
+    
+    async def get_customer_aggregates(self, filters: Optional[FilterCriteria] = None) -> CustomerAggregates:
+        """Aggregate customer count, satisfaction and age buckets in a single query."""
+        stmt = (
+            select(
+                func.grouping(Customer.age),
+                Customer.age,
+                func.count(),
+                func.sum(Customer.satisfaction),
+            )
+            .where(*_customer_filter_clauses(filters))
+            .group_by(func.grouping_sets(tuple_(Customer.age), tuple_()))
+        )
         
         result = await self.db_session.execute(stmt)
-        customer_records = result.scalars().all()
-        
-        return [
-            CustomerData(
-                customer_id=record.customer_id,
-                age=record.age,
-                gender=record.gender,
-                purchase_amount=float(record.purchase_amount),
-                satisfaction=record.satisfaction
+        
+        count, satisfaction_sum = 0, 0
+        age_counts = []
+        for grouping, age, rows, satisfaction in result:
+            if grouping == 0:
+                age_counts.append((age, rows))
+            else:
+                count, satisfaction_sum = rows, satisfaction or 0
+        
+        return CustomerAggregates(
+            count=count,
+            avg_satisfaction=satisfaction_sum / count if count else 0,
+            age_counts=sorted(age_counts),
+        )
+    
+    async def get_age_range(self) -> tuple[int, int]:
+        """Youngest and oldest customer age, each read from one end of idx_customers_age."""
+        result = await self.db_session.execute(select(func.min(Customer.age), func.max(Customer.age)))
+        low, high = result.one()
+        return (low, high) if low is not None else (0, 0)
+    
+    async def get_genders(self) -> List[str]:
+        """List distinct genders with a skip scan over idx_customers_gender.
+
+        Each step of the recursive query jumps to the next larger gender with
+        one index probe, so the cost depends on the number of distinct values
+        rather than on the number of customers.
+        """
+        result = await self.db_session.execute(text("""
+            WITH RECURSIVE genders AS (
+                (SELECT gender FROM customers ORDER BY gender LIMIT 1)
+                UNION ALL
+                SELECT (
+                    SELECT c.gender FROM customers c
+                    WHERE c.gender > g.gender
+                    ORDER BY c.gender LIMIT 1
+                )
+                FROM genders g
+                WHERE g.gender IS NOT NULL
             )
-            for record in customer_records
-        ]
\ No newline at end of file
+            SELECT gender FROM genders WHERE gender IS NOT NULL
+        """))
+        return list(result.scalars())
+
+
+class PostgreSQLSalesRollupRepository:
+    """Maintains the sales_daily_rollup table from the sales table."""
+    
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+    
+    async def refresh(self) -> int:
+        """Recompute rollup rows for the dates touched since the last refresh."""
+        result = await self.db_session.execute(
+            delete(SalesRollupDirtyDate).returning(SalesRollupDirtyDate.date)
+        )
+        dirty_dates = result.scalars().all()
+        
+        if dirty_dates:
+            await self.db_session.execute(
+                delete(SalesDailyRollup).where(SalesDailyRollup.date.in_(dirty_dates))
+            )
+            await self.db_session.execute(
+                insert(SalesDailyRollup).from_select(
+                    ["date", "category_id", "region_id", "total", "count"],
+                    select(
+                        Sales.date,
+                        Sales.category_id,
+                        Sales.region_id,
+                        func.sum(Sales.sales),
+                        func.count(),
+                    )
+                    .where(Sales.date.in_(dirty_dates))
+                    .group_by(Sales.date, Sales.category_id, Sales.region_id),
+                )
+            )
+        
+        await self.db_session.commit()
+        return len(dirty_dates)
@@ -0,0 +1,200 @@
+"""Result cache shared by the worker processes of one deployment."""
+
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+from src.infrastructure.data_version import data_version
+
+# sqlite:///relative/path, sqlite:////absolute/path or redis://host:port/db; unset keeps results per process
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL", "")
+SHARED_CACHE_TTL_SECONDS = float(os.getenv("SHARED_CACHE_TTL_SECONDS", "300"))
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "4096"))
+
+_BACKEND_ERRORS = (OSError, sqlite3.Error) + ((redis.RedisError,) if redis is not None else ())
+
+
+@dataclass
+class SharedCacheStats:
+    backend: str
+    hits: int
+    misses: int
+    errors: int
+
+
+class SqliteCacheBackend:
+    """Entries in one SQLite file in WAL mode, opened by every worker on the host."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path, max_entries: int = SHARED_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                "key TEXT PRIMARY KEY, version INTEGER NOT NULL, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS result_cache_expires_at ON result_cache (expires_at)")
+            self._connection = connection
+        return self._connection
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM result_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, version: int, value: bytes, ttl_seconds: float) -> None:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?, ?)", (key, version, now + ttl_seconds, value)
+            )
+            # Drop expired entries, then the ones closest to expiring beyond max_entries
+            connection.execute("DELETE FROM result_cache WHERE expires_at <= ?", (now,))
+            connection.execute(
+                "DELETE FROM result_cache WHERE key IN "
+                "(SELECT key FROM result_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _prune(self, version: int) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM result_cache WHERE version < ?", (version,))
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, version: int, value: bytes, ttl_seconds: float) -> None:
+        await asyncio.to_thread(self._set, key, version, value, ttl_seconds)
+
+    async def prune(self, version: int) -> None:
+        await asyncio.to_thread(self._prune, version)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+
+class RedisCacheBackend:
+    """Entries in Redis, which expires them itself."""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        self._client = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(f"result-cache:{key}")
+
+    async def set(self, key: str, version: int, value: bytes, ttl_seconds: float) -> None:
+        await self._client.set(f"result-cache:{key}", value, px=max(1, int(ttl_seconds * 1000)))
+
+    async def prune(self, version: int) -> None:
+        # Entries of older versions are unreachable and expire with their TTL
+        return None
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class SharedResultCache:
+    """Second tier behind the per-process ResultCache, seen by every worker.
+
+    Keys start with the data version current when the lookup began, so an
+    ingest makes older entries unreachable without the workers coordinating
+    their invalidations. A worker that has not processed the notification
+    yet keeps using the previous version's entries, which match the data
+    it still serves. Backend failures are counted and treated as misses.
+    """
+
+    def __init__(self, backend, ttl_seconds: float = SHARED_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        version = data_version.current
+        versioned_key = f"{version}:{key}"
+        try:
+            payload = await self.backend.get(versioned_key)
+            if payload is not None:
+                result = pickle.loads(payload)
+                self._hits += 1
+                return result
+        except (*_BACKEND_ERRORS, pickle.UnpicklingError, AttributeError, ImportError):
+            # Entries written by another release may no longer unpickle
+            self._errors += 1
+        self._misses += 1
+
+        result = await compute()
+        try:
+            await self.backend.set(
+                versioned_key, version, pickle.dumps(result, pickle.HIGHEST_PROTOCOL), self.ttl_seconds
+            )
+        except _BACKEND_ERRORS:
+            self._errors += 1
+        return result
+
+    async def prune(self) -> None:
+        """Drop entries of versions older than the current one, where the backend needs it."""
+        try:
+            await self.backend.prune(data_version.current)
+        except _BACKEND_ERRORS:
+            self._errors += 1
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    def stats(self) -> SharedCacheStats:
+        return SharedCacheStats(
+            backend=self.backend.name,
+            hits=self._hits,
+            misses=self._misses,
+            errors=self._errors,
+        )
+
+
+def create_shared_cache(url: str) -> Optional[SharedResultCache]:
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SharedResultCache(SqliteCacheBackend(Path(url.removeprefix("sqlite:///"))))
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        if redis is None:
+            raise RuntimeError("SHARED_CACHE_URL points at Redis but the redis package is not installed")
+        return SharedResultCache(RedisCacheBackend(url))
+    raise ValueError(f"Unsupported SHARED_CACHE_URL: {url}")
+
+
+# Process-wide handle on the shared cache, None unless SHARED_CACHE_URL is set
+shared_result_cache = create_shared_cache(SHARED_CACHE_URL)
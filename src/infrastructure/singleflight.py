@@ -0,0 +1,75 @@
+"""Coalescing of identical concurrent computations into one shared task."""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class SingleFlightStats:
+    in_flight: int
+    started: int
+    coalesced: int
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time and shares its result.
+
+    Callers await the shared task through asyncio.shield, so cancelling one
+    caller, for example because its client disconnected, leaves the others
+    waiting. The task is only cancelled once every caller has gone. Since it
+    outlives the caller that started it, the computation must not use that
+    caller's request-scoped session.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is not None and (call.task.cancelling() or call.task.cancelled()):
+            # Abandoned by its last caller; joining it would only raise CancelledError
+            call = None
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.create_task(compute()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self._started += 1
+        else:
+            self._coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                # Forget it now rather than when the cancellation completes, so a
+                # caller arriving in between starts a new call
+                self._forget(key, call)
+
+    def _forget(self, key: str, call: _Call) -> None:
+        # A cancelled call may already have been replaced by a new one
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            in_flight=len(self._calls),
+            started=self._started,
+            coalesced=self._coalesced,
+        )
+
+
+# Process-wide coalescing shared by every request
+single_flight = SingleFlight()
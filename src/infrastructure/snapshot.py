@@ -0,0 +1,285 @@
+"""Columnar in-memory snapshot of sales and customer data."""
+
+import asyncio
+import os
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.models import (
+    GRANULARITIES,
+    SATISFACTION_RANGES,
+    CustomerAggregates,
+    CustomerBatch,
+    CustomerData,
+    FilterCriteria,
+    FilterOptions,
+    SalesAggregates,
+    SalesBatch,
+    SalesData,
+)
+from src.infrastructure.models import Category, Customer, Region, Sales
+from src.infrastructure.tracing import traced
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def _as_day(value) -> np.datetime64:
+    value = value.date() if hasattr(value, 'date') else value
+    return np.datetime64(value, 'D')
+
+
+def _bucket_starts(dates: np.ndarray, granularity: str) -> np.ndarray:
+    """Map datetime64[D] values to the first day of their week, month or quarter."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    if granularity == "week":
+        # 1970-01-01 was a Thursday; shift so that weeks start on Monday like date_trunc
+        days = dates.astype(np.int64)
+        return (days - (days + 3) % 7).astype('datetime64[D]')
+    if granularity == "month":
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    if granularity == "quarter":
+        months = dates.astype('datetime64[M]').astype(np.int64)
+        return (months - months % 3).astype('datetime64[M]').astype('datetime64[D]')
+    return dates
+
+
+def _codes_for(names: Sequence[str], dictionary: Sequence[str]) -> np.ndarray:
+    wanted = set(names)
+    return np.array([i for i, name in enumerate(dictionary) if name in wanted], dtype=np.int32)
+
+
+@traced("snapshot")
+@dataclass(frozen=True)
+class ColumnarSnapshot:
+    """Read-only column arrays with dictionary-encoded dimensions.
+
+    Sales are kept in date-descending order and customers in customer_id
+    order, matching the ordering of the PostgreSQL repositories.
+    """
+
+    sales_dates: np.ndarray
+    sales_date_codes: np.ndarray
+    sales_amounts: np.ndarray
+    sales_category_codes: np.ndarray
+    sales_region_codes: np.ndarray
+    dates: np.ndarray
+    categories: tuple[str, ...]
+    regions: tuple[str, ...]
+    customer_ids: np.ndarray
+    customer_ages: np.ndarray
+    customer_gender_codes: np.ndarray
+    customer_purchase_amounts: np.ndarray
+    customer_satisfaction: np.ndarray
+    genders: tuple[str, ...]
+
+    def sales_mask(self, filters: Optional[FilterCriteria]) -> np.ndarray:
+        mask = np.ones(len(self.sales_amounts), dtype=bool)
+        if not filters:
+            return mask
+
+        if filters.date_range:
+            start, end = _as_day(filters.date_range[0]), _as_day(filters.date_range[1])
+            mask &= (self.sales_dates >= start) & (self.sales_dates <= end)
+        if filters.categories:
+            mask &= np.isin(self.sales_category_codes, _codes_for(filters.categories, self.categories))
+        if filters.regions:
+            mask &= np.isin(self.sales_region_codes, _codes_for(filters.regions, self.regions))
+        if filters.sales_range:
+            low, high = filters.sales_range
+            mask &= (self.sales_amounts >= low) & (self.sales_amounts <= high)
+        return mask
+
+    def customer_mask(self, filters: Optional[FilterCriteria]) -> np.ndarray:
+        mask = np.ones(len(self.customer_ids), dtype=bool)
+        if not filters:
+            return mask
+
+        if filters.age_range:
+            low, high = filters.age_range
+            mask &= (self.customer_ages >= low) & (self.customer_ages <= high)
+        if filters.genders:
+            mask &= np.isin(self.customer_gender_codes, _codes_for(filters.genders, self.genders))
+        satisfaction_range = SATISFACTION_RANGES.get(filters.satisfaction_filter)
+        if satisfaction_range:
+            low, high = satisfaction_range
+            mask &= (self.customer_satisfaction >= low) & (self.customer_satisfaction <= high)
+        return mask
+
+    def _sales_batch(self, selector: np.ndarray) -> SalesBatch:
+        # The column buffers are copied straight into the batch arrays, without per-row objects
+        return SalesBatch(
+            days=array("i", self.sales_dates[selector].astype(np.int32).tobytes()),
+            sales=array("d", self.sales_amounts[selector].astype(np.float64).tobytes()),
+            category_codes=array("i", self.sales_category_codes[selector].astype(np.int32).tobytes()),
+            categories=self.categories,
+            region_codes=array("i", self.sales_region_codes[selector].astype(np.int32).tobytes()),
+            regions=self.regions,
+        )
+
+    def _customer_batch(self, selector: np.ndarray) -> CustomerBatch:
+        return CustomerBatch(
+            customer_ids=array("q", self.customer_ids[selector].astype(np.int64).tobytes()),
+            ages=array("i", self.customer_ages[selector].astype(np.int32).tobytes()),
+            gender_codes=array("i", self.customer_gender_codes[selector].astype(np.int32).tobytes()),
+            genders=self.genders,
+            purchase_amounts=array("d", self.customer_purchase_amounts[selector].astype(np.float64).tobytes()),
+            satisfaction=array("i", self.customer_satisfaction[selector].astype(np.int32).tobytes()),
+        )
+
+    def sales_data(self, filters: Optional[FilterCriteria] = None) -> SalesBatch:
+        return self._sales_batch(self.sales_mask(filters))
+
+    def customer_data(self, filters: Optional[FilterCriteria] = None) -> CustomerBatch:
+        return self._customer_batch(self.customer_mask(filters))
+
+    def iter_sales_batches(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> Iterator[SalesBatch]:
+        indices = np.flatnonzero(self.sales_mask(filters))
+        for start in range(0, len(indices), batch_size):
+            yield self._sales_batch(indices[start:start + batch_size])
+
+    def iter_customer_batches(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> Iterator[CustomerBatch]:
+        indices = np.flatnonzero(self.customer_mask(filters))
+        for start in range(0, len(indices), batch_size):
+            yield self._customer_batch(indices[start:start + batch_size])
+
+    def iter_sales_data(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> Iterator[SalesData]:
+        for batch in self.iter_sales_batches(filters, batch_size):
+            yield from batch
+
+    def iter_customer_data(
+        self, filters: Optional[FilterCriteria] = None, batch_size: int = 1000
+    ) -> Iterator[CustomerData]:
+        for batch in self.iter_customer_batches(filters, batch_size):
+            yield from batch
+
+    def aggregate_sales(
+        self, filters: Optional[FilterCriteria] = None, granularity: str = "day"
+    ) -> SalesAggregates:
+        mask = self.sales_mask(filters)
+        amounts = self.sales_amounts[mask]
+
+        def group(codes: np.ndarray, keys: Sequence) -> List[tuple]:
+            counts = np.bincount(codes[mask], minlength=len(keys))
+            totals = np.bincount(codes[mask], weights=amounts, minlength=len(keys))
+            present = np.flatnonzero(counts)
+            return [(keys[i], float(totals[i])) for i in present]
+
+        if granularity == "day":
+            bucket_codes, buckets = self.sales_date_codes, self.dates
+        else:
+            buckets, date_to_bucket = np.unique(_bucket_starts(self.dates, granularity), return_inverse=True)
+            bucket_codes = date_to_bucket[self.sales_date_codes]
+
+        return SalesAggregates(
+            total_sales=float(amounts.sum()),
+            count=int(amounts.size),
+            by_date=group(bucket_codes, buckets.tolist()),
+            by_category=sorted(group(self.sales_category_codes, self.categories)),
+            by_region=sorted(group(self.sales_region_codes, self.regions)),
+        )
+
+    def aggregate_customers(self, filters: Optional[FilterCriteria] = None) -> CustomerAggregates:
+        mask = self.customer_mask(filters)
+        ages = self.customer_ages[mask]
+        satisfaction = self.customer_satisfaction[mask]
+
+        age_counts = np.bincount(ages) if ages.size else np.zeros(0, dtype=np.int64)
+        present = np.flatnonzero(age_counts)
+
+        return CustomerAggregates(
+            count=int(ages.size),
+            avg_satisfaction=float(satisfaction.mean()) if satisfaction.size else 0,
+            age_counts=[(int(age), int(age_counts[age])) for age in present],
+        )
+
+    def filter_options(self) -> FilterOptions:
+        """The same options as the repositories: every dimension, and (0, 0) ranges without rows."""
+        amounts, ages = self.sales_amounts, self.customer_ages
+        return FilterOptions(
+            categories=sorted(self.categories),
+            regions=sorted(self.regions),
+            sales_range=(float(amounts.min()), float(amounts.max())) if amounts.size else (0.0, 0.0),
+            age_range=(int(ages.min()), int(ages.max())) if ages.size else (0, 0),
+            genders=list(self.genders),
+        )
+
+
+async def load_snapshot(session: AsyncSession) -> ColumnarSnapshot:
+    """Read sales, customers and their dimensions into a new snapshot."""
+    category_rows = (await session.execute(select(Category.id, Category.name).order_by(Category.name))).all()
+    region_rows = (await session.execute(select(Region.id, Region.name).order_by(Region.name))).all()
+    category_index = {category_id: code for code, (category_id, _) in enumerate(category_rows)}
+    region_index = {region_id: code for code, (region_id, _) in enumerate(region_rows)}
+
+    sales_rows = (await session.execute(
+        select(Sales.date, Sales.sales, Sales.category_id, Sales.region_id)
+        .order_by(Sales.date.desc(), Sales.id)
+    )).all()
+    sales_dates = np.array([row[0] for row in sales_rows], dtype='datetime64[D]')
+    dates, sales_date_codes = np.unique(sales_dates, return_inverse=True)
+
+    customer_rows = (await session.execute(
+        select(
+            Customer.customer_id,
+            Customer.age,
+            Customer.gender,
+            Customer.purchase_amount,
+            Customer.satisfaction,
+        )
+        .order_by(Customer.customer_id)
+    )).all()
+    genders = tuple(sorted({row[2] for row in customer_rows}))
+    gender_index = {gender: code for code, gender in enumerate(genders)}
+
+    return ColumnarSnapshot(
+        sales_dates=sales_dates,
+        sales_date_codes=sales_date_codes.astype(np.int32),
+        sales_amounts=np.array([row[1] for row in sales_rows], dtype=np.float64),
+        sales_category_codes=np.array([category_index[row[2]] for row in sales_rows], dtype=np.int32),
+        sales_region_codes=np.array([region_index[row[3]] for row in sales_rows], dtype=np.int32),
+        dates=dates,
+        categories=tuple(name for _, name in category_rows),
+        regions=tuple(name for _, name in region_rows),
+        customer_ids=np.array([row[0] for row in customer_rows], dtype=np.int64),
+        customer_ages=np.array([row[1] for row in customer_rows], dtype=np.int32),
+        customer_gender_codes=np.array([gender_index[row[2]] for row in customer_rows], dtype=np.int32),
+        customer_purchase_amounts=np.array([row[3] for row in customer_rows], dtype=np.float64),
+        customer_satisfaction=np.array([row[4] for row in customer_rows], dtype=np.int32),
+        genders=genders,
+    )
+
+
+class SnapshotStore:
+    """Holds the current snapshot and swaps in fully built replacements."""
+
+    def __init__(self):
+        self._snapshot: Optional[ColumnarSnapshot] = None
+        self._reload_lock = asyncio.Lock()
+
+    @property
+    def current(self) -> Optional[ColumnarSnapshot]:
+        return self._snapshot
+
+    async def reload(self, session_factory: Callable[[], AsyncSession]) -> ColumnarSnapshot:
+        """Build a new snapshot and publish it with a single reference swap."""
+        async with self._reload_lock:
+            async with session_factory() as session:
+                snapshot = await load_snapshot(session)
+            self._snapshot = snapshot
+            return snapshot
+
+
+# Process-wide snapshot shared by every request
+snapshot_store = SnapshotStore()
@@ -0,0 +1,113 @@
+"""Timing spans around repository, use case and query execution stages."""
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.infrastructure.metrics import stage_duration
+
+
+class RequestTimings:
+    """Total time and number of calls per stage within one request."""
+
+    def __init__(self):
+        self.stages: dict[str, list] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        totals = self.stages.get(stage)
+        if totals is None:
+            self.stages[stage] = [seconds, 1]
+        else:
+            totals[0] += seconds
+            totals[1] += 1
+
+    def server_timing(self) -> str:
+        """The stages as a Server-Timing header value, in milliseconds."""
+        return ", ".join(
+            f'{stage};dur={seconds * 1000:.2f};desc="{count}x"'
+            for stage, (seconds, count) in self.stages.items()
+        )
+
+
+# Timings of the request being handled, if any
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def record(stage: str, seconds: float) -> None:
+    stage_duration.observe((stage,), seconds)
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def _traced_coroutine(stage: str, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            record(stage, time.perf_counter() - started)
+    return wrapper
+
+
+def _traced_function(stage: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            record(stage, time.perf_counter() - started)
+    return wrapper
+
+
+def traced(prefix: str):
+    """Class decorator recording a "<prefix>.<method>" span for every public method.
+
+    Generators are left alone: they run interleaved with the response they
+    stream, so their duration is not a stage of the request.
+    """
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(attribute):
+                continue
+            if inspect.isasyncgenfunction(attribute) or inspect.isgeneratorfunction(attribute):
+                continue
+            stage = f"{prefix}.{name}"
+            if inspect.iscoroutinefunction(attribute):
+                setattr(cls, name, _traced_coroutine(stage, attribute))
+            else:
+                setattr(cls, name, _traced_function(stage, attribute))
+        return cls
+    return decorate
+
+
+def trace_queries(engine: AsyncEngine) -> None:
+    """Record a "db.execute" span for every statement the engine runs.
+
+    With buffered results this covers the round trip and fetching the rows,
+    so a repository span minus its db.execute time is the hydration cost.
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record("db.execute", time.perf_counter() - context.query_started)
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.infrastructure.models import Sales
+from src.infrastructure.repositories import _decode_cursor, _encode_cursor
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def test_decode_cursor_round_trip():
+    cursor = _encode_cursor("sales", True, Decimal("123.45"), 7)
+    assert _decode_cursor(cursor, "sales", True, Sales.sales) == (Decimal("123.45"), 7)
+
+    cursor = _encode_cursor("date", False, date(2024, 1, 31), 3)
+    assert _decode_cursor(cursor, "date", False, Sales.date) == (date(2024, 1, 31), 3)
+
+
+@pytest.mark.parametrize("cursor, sort_by, sort_column", [
+    ("not base64!", "sales", Sales.sales),
+    (_cursor(["sales", True]), "sales", Sales.sales),
+    (_cursor(["sales", True, "abc", 7]), "sales", Sales.sales),
+    (_cursor(["sales", True, "1.5", "x"]), "sales", Sales.sales),
+    (_cursor(["date", True, "2024-13-01", 7]), "date", Sales.date),
+    (_cursor(["date", True, None, 7]), "date", Sales.date),
+])
+def test_decode_cursor_rejects_malformed_cursors(cursor, sort_by, sort_column):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(cursor, sort_by, True, sort_column)
+
+
+@pytest.mark.parametrize("row_id", [7.5, 7.0, True, None, "7"])
+def test_decode_cursor_rejects_non_integer_row_ids(row_id):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(_cursor(["sales", True, "1.5", row_id]), "sales", True, Sales.sales)
@@ -0,0 +1,56 @@
+import asyncio
+
+from src.infrastructure.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_computation():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+        return results, flight.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == [1] * 5
+    assert (stats.in_flight, stats.started, stats.coalesced) == (0, 1, 4)
+
+
+def test_caller_after_last_waiter_cancelled_starts_a_new_call():
+    async def scenario():
+        flight = SingleFlight()
+        started = 0
+
+        async def compute():
+            nonlocal started
+            started += 1
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                # Keep the cancelled task pending for a while, like one unwinding a query
+                await asyncio.sleep(0.01)
+                raise
+            return "stale"
+
+        async def quick():
+            return "fresh"
+
+        first = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        # The abandoned task is still unwinding when the next caller arrives
+        result = await flight.do("key", quick)
+        return result, started, first.cancelled(), flight.stats()
+
+    result, started, first_cancelled, stats = asyncio.run(scenario())
+    assert result == "fresh"
+    assert started == 1
+    assert first_cancelled
+    assert (stats.in_flight, stats.started, stats.coalesced) == (0, 2, 0)